@@ -0,0 +1,60 @@
+from pyrevit import revit, DB, forms
+import csv
+from System import Type
+from System.Collections.Generic import List
+from revitesse import idValue
+from revitesse.spatial import findOverlaps, getViewRect
+from revitesse.tags import selectTargetViews
+
+doc = revit.doc
+uidoc = revit.uidoc
+
+annotationFilter = DB.ElementMulticlassFilter(List[Type]([DB.TextNote, DB.IndependentTag]))
+
+# Text notes and tags of a view as rectangles in the view plane
+def getAnnotationRects(view):
+    rects = []
+    for elem in DB.FilteredElementCollector(doc, view.Id).WherePasses(annotationFilter):
+        box = elem.get_BoundingBox(view)
+        if not box: continue
+        rects.append((elem.Id,) + getViewRect(box, view))
+    return rects
+
+# 1. Views to check
+views = selectTargetViews(doc, "Find annotation clashes in:", includeSheets=True)
+if not views: forms.alert("No views selected.", exitscript=True)
+
+# 2. Overlapping pairs per view
+report = []
+with forms.ProgressBar(title="Checking views ({value} of {max_value})", cancellable=True) as pb:
+    for i, view in enumerate(views):
+        if pb.cancelled: break
+        try: clashes = findOverlaps(getAnnotationRects(view))
+        except: clashes = []
+        if clashes: report.append((view, clashes))
+        pb.update_progress(i + 1, len(views))
+
+if not report: forms.alert("No overlapping text notes or tags found.", exitscript=True)
+
+# 3. Select the clashing annotations
+clashingIds = {}
+for view, clashes in report:
+    for a, b in clashes:
+        clashingIds[idValue(a)] = a
+        clashingIds[idValue(b)] = b
+uidoc.Selection.SetElementIds(List[DB.ElementId](clashingIds.values()))
+
+clashCount = sum(len(clashes) for _, clashes in report)
+summary = "\n".join("{}: {}".format(view.Name, len(clashes)) for view, clashes in sorted(report, key=lambda r: -len(r[1]))[:25])
+forms.alert("{} clashes in {} of {} views. {} annotations selected.".format(clashCount, len(report), len(views), len(clashingIds)), sub_msg=summary)
+
+# 4. Export the clashes per view
+csvPath = forms.save_file(file_ext='csv', title="Save CSV file")
+if csvPath:
+    with open(csvPath, 'w') as f:
+        writer = csv.writer(f)
+        writer.writerow(["View", "View Id", "Element A", "Category A", "Element B", "Category B"])
+        for view, clashes in report:
+            for a, b in clashes:
+                writer.writerow([view.Name, idValue(view.Id), idValue(a), doc.GetElement(a).Category.Name, idValue(b), doc.GetElement(b).Category.Name])
+    forms.alert("Exported to: " + csvPath)
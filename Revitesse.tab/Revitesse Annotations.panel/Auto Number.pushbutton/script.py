@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+# The updater lives in this engine, so it has to outlive the command
+__persistentengine__ = True
+
+from pyrevit import forms
+from revitesse.numbering import loadNumberingSettings
+from revitesse.autonumber import autoNumberingCategories, isAutoNumberingEnabled, enableAutoNumbering, disableAutoNumbering
+
+if __name__ == "__main__":
+    if isAutoNumberingEnabled():
+        disableAutoNumbering()
+        forms.alert("Auto numbering is off.", title="Auto Number")
+    else:
+        savedCategories = [name for name in autoNumberingCategories if loadNumberingSettings(name)]
+        if not savedCategories: forms.alert("Run Number Doors or Number Windows once so their settings are saved, then turn auto numbering on.", exitscript=True)
+        enableAutoNumbering()
+        forms.alert("Auto numbering is on for {} until Revit closes.".format(" and ".join(name.lower() for name in savedCategories)),
+                    sub_msg="Newly placed or moved elements get the next free mark in their room, using the settings of the last numbering run.", title="Auto Number")
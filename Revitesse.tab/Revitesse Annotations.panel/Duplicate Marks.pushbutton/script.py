@@ -0,0 +1,58 @@
+from pyrevit import revit, DB, forms, script
+from System.Collections.Generic import List
+from revitesse import idValue
+from revitesse.parameters import getMarkParameterId
+from revitesse.numbering import getMark, getMarkKey, findDuplicateMarks, resolveDuplicateMarks
+
+doc = revit.doc
+uidoc = revit.uidoc
+
+# 1. One pass over the model instances that have a mark, grouped by category
+markParameterIds = {}
+recordsByCategory = {}
+for elem in DB.FilteredElementCollector(doc).WhereElementIsNotElementType():
+    category = elem.Category
+    if not category or category.CategoryType != DB.CategoryType.Model: continue
+    categoryId = idValue(category.Id)
+    if categoryId not in markParameterIds: markParameterIds[categoryId] = getMarkParameterId(category.Id)
+    mark = getMark(elem, markParameterIds[categoryId])
+    if not mark: continue
+    if category.Name not in recordsByCategory: recordsByCategory[category.Name] = []
+    recordsByCategory[category.Name].append((elem, mark))
+if not recordsByCategory: forms.alert("No marked elements found.", exitscript=True)
+
+# 2. Categories and scope to check
+labels = dict(("{} ({} marks)".format(name, len(records)), name) for name, records in recordsByCategory.items())
+chosenLabels = forms.SelectFromList.show(sorted(labels.keys()), title="Select Categories to Check", multiselect=True)
+if not chosenLabels: forms.alert("No categories selected.", exitscript=True)
+scope = forms.CommandSwitchWindow.show(["Within each category", "Across chosen categories"], message="Marks must be unique:")
+if not scope: script.exit()
+acrossCategories = scope == "Across chosen categories"
+
+records = [record for label in chosenLabels for record in recordsByCategory[labels[label]]]
+duplicates = findDuplicateMarks(records, acrossCategories)
+if not duplicates: forms.alert("No duplicate marks found in {} elements.".format(len(records)), exitscript=True)
+
+# 3. Report and select the collision groups
+collidingIds = [elem.Id for elems in duplicates.values() for elem in elems]
+uidoc.Selection.SetElementIds(List[DB.ElementId](collidingIds))
+groups = sorted(duplicates.items(), key=lambda item: -len(item[1]))
+summary = "\n".join("'{}' x {} ({})".format(key if acrossCategories else key[1], len(elems), ", ".join(sorted(set(e.Category.Name for e in elems)))) for key, elems in groups[:25])
+if len(groups) > 25: summary += "\n..."
+resolve = forms.alert("{} duplicate marks shared by {} elements (selected). Resolve them by appending suffixes?".format(len(duplicates), len(collidingIds)),
+                      sub_msg=summary, yes=True, no=True)
+if not resolve: script.exit()
+
+# 4. The first element of each group keeps its mark, only the others are written
+separator = forms.ask_for_string(default="-", prompt="Separator before the suffix:", title="Duplicate Marks")
+if separator is None: script.exit()
+usedKeys = set(getMarkKey(elem, mark, acrossCategories) for elem, mark in records)
+newMarks = resolveDuplicateMarks(duplicates, usedKeys, acrossCategories, separator)
+
+t = DB.Transaction(doc, "Resolve Duplicate Marks")
+t.Start()
+for elem, mark in newMarks.values():
+    markParameter = elem.get_Parameter(markParameterIds[idValue(elem.Category.Id)])
+    if markParameter and not markParameter.IsReadOnly: markParameter.Set(mark)
+t.Commit()
+forms.alert("{} marks changed.".format(len(newMarks)))
@@ -0,0 +1,65 @@
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
+from pyrevit import revit, DB, forms
+from revitesse.findreplace import planParameterChanges, planTextNoteChanges
+
+doc = revit.doc
+
+# Number of elements written per transaction
+chunkSize = 500
+maximumPreviewLines = 25
+
+# 1. Text to find and its replacement
+find = forms.ask_for_string(prompt="Find text:", title="Find and Replace")
+if not find: forms.alert("Operation cancelled.", exitscript=True)
+replaceWith = forms.ask_for_string(default="", prompt="Replace \"{}\" with:".format(find), title="Find and Replace")
+if replaceWith is None: forms.alert("Operation cancelled.", exitscript=True)
+
+# 2. Categories to search
+categories = [cat for cat in doc.Settings.Categories if cat.AllowsBoundParameters and cat.CategoryType in (DB.CategoryType.Model, DB.CategoryType.Annotation)]
+categoryNameToCategory = {cat.Name: cat for cat in categories}
+chosenCategoryNames = forms.SelectFromList.show(sorted(categoryNameToCategory.keys()), title="Select Categories to Search", multiselect=True)
+if not chosenCategoryNames: forms.alert("No categories selected.", exitscript=True)
+chosenCategories = [categoryNameToCategory[name] for name in chosenCategoryNames]
+
+# 3. Plan and preview
+plans = []
+if any(c.Id == DB.ElementId(DB.BuiltInCategory.OST_TextNotes) for c in chosenCategories): plans.extend(planTextNoteChanges(doc, find, replaceWith))
+plans.extend(planParameterChanges(doc, chosenCategories, find, replaceWith))
+
+total = sum(len(changes) for _, changes in plans)
+if not total: forms.alert("No values contain \"{}\".".format(find), exitscript=True)
+
+previewLines = ["{}  ({})".format(label, len(changes)) for label, changes in plans[:maximumPreviewLines]]
+if len(plans) > maximumPreviewLines: previewLines.append("... and {} more".format(len(plans) - maximumPreviewLines))
+if not forms.alert("Replace in {} values?".format(total), sub_msg="\n".join(previewLines), yes=True, no=True): forms.alert("Operation cancelled.", exitscript=True)
+
+# 4. Apply in chunked transactions, rolled back as a whole if anything escapes
+allChanges = [change for _, changes in plans for change in changes]
+written, failed = 0, 0
+tg = DB.TransactionGroup(doc, "Find and Replace")
+tg.Start()
+t = None
+try:
+    with forms.ProgressBar(title="Replacing ({value} of {max_value})", cancellable=True) as pb:
+        for start in range(0, total, chunkSize):
+            if pb.cancelled: break
+            t = DB.Transaction(doc, "Find and Replace")
+            t.Start()
+            for elementId, apply in allChanges[start:start + chunkSize]:
+                try:
+                    apply(doc.GetElement(elementId))
+                    written += 1
+                except: failed += 1
+            t.Commit()
+            pb.update_progress(min(start + chunkSize, total), total)
+    tg.Assimilate()
+finally:
+    if t and t.HasStarted() and not t.HasEnded(): t.RollBack()
+    if not tg.HasEnded(): tg.RollBack()
+
+message = "Replaced text in {} values.".format(written)
+if failed: message += "\n{} values could not be written.".format(failed)
+if written + failed < total: message += "\nCancelled before {} values were processed.".format(total - written - failed)
+forms.alert(message)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from pyrevit import forms
+from revitesse.numbering import numberingCategories, runNumberingTool
+
+# Any configured category can be numbered by room
+if __name__ == "__main__":
+    categoryName = forms.SelectFromList.show(sorted(numberingCategories.keys()), title="Number Elements", button_name="Select Category")
+    if not categoryName: forms.alert("No category selected.", exitscript=True)
+    runNumberingTool(categoryName)
@@ -1,4 +1,7 @@
-import clr
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
+import clr, re
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 clr.AddReference('System.Windows.Forms')
@@ -10,14 +13,17 @@ from System.Windows.Forms import *
 from System.Drawing import *
 from System.Collections.Generic import List
 from System import Array, Object
+from revitesse.textnotes import getTextNoteIndex, getScopeViewIds, normalizeText, replaceInNote, getNoteReplacements
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
 
+replaceModes = ["Whole text", "Matching part only", "Regular expression"]
+
 class TextSelectorForm(Form):
     def __init__(self):
         self.Text = "Select Text"
-        self.Size = Size(380, 260)  # Adjusted size for new layout
+        self.Size = Size(380, 295)  # Adjusted size for new layout
         self.StartPosition = FormStartPosition.CenterScreen
         self.FormBorderStyle = FormBorderStyle.FixedDialog
         self.MaximizeBox = False
@@ -54,23 +60,32 @@ class TextSelectorForm(Form):
         self.containsText.Leave += lambda s, e: self.restoreNone()
         self.Controls.Add(self.containsText)
 
+        # Replace mode: whole note text, or only the matching part (plain or regular expression)
+        self.modeLabel = self.createLabel("Replace Mode", 20, 150)
+        self.modeCombo = self.createCombo(replaceModes, 150, 148, 200)
+        self.Controls.Add(self.modeLabel)
+        self.Controls.Add(self.modeCombo)
+
         # Replace text label and single-line textbox
-        self.replaceLabel = self.createLabel("Replace With", 20, 150)
+        self.replaceLabel = self.createLabel("Replace With", 20, 185)
         self.replaceText = TextBox()
-        self.replaceText.Location = Point(150, 150)
+        self.replaceText.Location = Point(150, 185)
         self.replaceText.Size = Size(200, 25)  # single line textbox
         self.Controls.Add(self.replaceLabel)
         self.Controls.Add(self.replaceText)
 
         # Buttons with spacing like original
-        buttonsList = [self.createButton("Replace", 280, 185, self.replaceButton), self.createButton("Cancel", 200, 185, self.cancelButton)]
+        buttonsList = [self.createButton("Replace", 280, 220, self.replaceButton), self.createButton("Cancel", 200, 220, self.cancelButton)]
         self.Controls.AddRange(Array[Control](buttonsList))
 
         # Events
         self.exactRadio.CheckedChanged += lambda s, e: self.toggleControls()
         self.containsRadio.CheckedChanged += lambda s, e: self.toggleControls()
+        self.spaceCombo.SelectedIndexChanged += lambda s, e: self.clearTextValues()
+        self.exactCombo.DropDown += lambda s, e: self.populateTextValues()
 
-        self.populateTextValues()
+        # Exact values are filled on first drop down, for the chosen scope only
+        self.textValuesScope = None
 
     def createLabel(self, text, x, y):
         label = Label()
@@ -106,25 +121,36 @@ class TextSelectorForm(Form):
         return button
 
     def populateTextValues(self):
-        collector = FilteredElementCollector(doc)
-        textNotes = collector.OfCategory(BuiltInCategory.OST_TextNotes).WhereElementIsNotElementType().ToElements()
-
-        # Get unique, non-system text values
-        textValues = set()
-        for note in textNotes:
-            if hasattr(note, 'Text') and note.Text:
-                text = note.Text.strip()
-                if text and not self.isSystemText(text): textValues.add(text)
-
-        sortedValues = sorted(textValues)
-        netArray = Array[Object](sortedValues)
-        self.exactCombo.Items.AddRange(netArray)
-        if sortedValues: self.exactCombo.SelectedIndex = 0
-
-    def isSystemText(self, text):
-        return (len(text) > 150 or
-                '123456789' in text.replace(' ', '') or
-                sum(1 for w in text.split() if len(w) == 1 and w.isalpha()) > 10)
+        scope = self.spaceCombo.SelectedItem
+        if self.textValuesScope == scope: return
+        self.textValuesScope = scope
+        index = getTextNoteIndex(doc)
+        sortedValues = index.getTextValues(getScopeViewIds(doc, scope))
+        self.exactCombo.Items.Clear()
+        self.exactCombo.Items.AddRange(Array[Object](sortedValues))
+
+    def clearTextValues(self):
+        self.textValuesScope = None
+        self.exactCombo.Items.Clear()
+
+    # Ids of the text notes matching the chosen scope and filter
+    def getMatchingNoteIds(self, regexPattern=None):
+        index = getTextNoteIndex(doc)
+        viewIds = getScopeViewIds(doc, self.spaceCombo.SelectedItem)
+        if self.exactRadio.Checked and self.exactCombo.SelectedItem: return index.findExact(str(self.exactCombo.SelectedItem), viewIds)
+        if regexPattern: return index.findRegex(regexPattern, viewIds)
+        contains = self.containsText.Text
+        if contains and contains != "<None>": return index.findContains(contains, viewIds)
+        return []
+
+    # Pattern of the part to replace, compiled once per click; None replaces the whole note text
+    def getReplacePattern(self):
+        mode = self.modeCombo.SelectedItem
+        if mode == "Whole text": return None
+        if self.exactRadio.Checked and self.exactCombo.SelectedItem: return re.compile(re.escape(str(self.exactCombo.SelectedItem)))
+        contains = self.containsText.Text
+        if mode == "Regular expression": return re.compile(contains)
+        return re.compile(re.escape(contains), re.IGNORECASE)
 
     def toggleControls(self):
         self.exactCombo.Enabled = self.exactRadio.Checked
@@ -144,40 +170,52 @@ class TextSelectorForm(Form):
         pass  # no longer used
 
     def replaceTextNotes(self):
-        replaceWith = self.replaceText.Text.strip()
-        if not replaceWith:
+        mode = self.modeCombo.SelectedItem
+        replaceWith = self.replaceText.Text.strip() if mode == "Whole text" else self.replaceText.Text
+        if mode == "Whole text" and not replaceWith:
             MessageBox.Show("Please enter replacement text.", "Input Required", MessageBoxButtons.OK, MessageBoxIcon.Warning)
             return False
+        if not (self.exactRadio.Checked and self.exactCombo.SelectedItem) and self.containsText.Text in ("", "<None>"):
+            MessageBox.Show("Please choose a text value or enter the text to find.", "Input Required", MessageBoxButtons.OK, MessageBoxIcon.Warning)
+            return False
 
         try:
-            # Get text notes based on scope
-            if self.spaceCombo.SelectedItem == "Active View":
-                collector = FilteredElementCollector(doc, doc.ActiveView.Id)
-            else:
-                collector = FilteredElementCollector(doc)
-
-            textNotes = collector.OfCategory(BuiltInCategory.OST_TextNotes).WhereElementIsNotElementType().ToElements()
-
-            # Filter notes
-            if self.exactRadio.Checked and self.exactCombo.SelectedItem:
-                target = str(self.exactCombo.SelectedItem)
-                matching = [n for n in textNotes if n.Text and n.Text.strip() == target]
-            else:
-                contains = self.containsText.Text
-                if contains and contains != "<None>": matching = [n for n in textNotes if n.Text and contains.lower() in n.Text.lower()]
-                else: matching = []
+            try: pattern = self.getReplacePattern()
+            except re.error as e:
+                MessageBox.Show("Invalid regular expression: {}".format(str(e)), "Input Required", MessageBoxButtons.OK, MessageBoxIcon.Warning)
+                return False
 
+            matching = self.getMatchingNoteIds(pattern if mode == "Regular expression" else None)
             if not matching:
                 MessageBox.Show("No text notes found to replace. Please adjust your criteria.", "No Results", MessageBoxButtons.OK, MessageBoxIcon.Information)
                 return False
 
+            # Preview: only notes whose text would actually change are written, judged on the same plain text the replace runs on
+            notes = [doc.GetElement(ElementId(noteId)) for noteId in matching]
+            expand = mode == "Regular expression"
+            if pattern: changing = [n for n in notes if getNoteReplacements(n.GetFormattedText().GetPlainText(), pattern, replaceWith, expand)]
+            else: changing = [n for n in notes if normalizeText(n.Text) != replaceWith]
+            if not changing:
+                MessageBox.Show("The {} matching text note(s) already have the replacement text.".format(len(notes)), "No Changes", MessageBoxButtons.OK, MessageBoxIcon.Information)
+                return False
+            if MessageBox.Show("Replace text in {} of {} matching text note(s)?".format(len(changing), len(notes)), "Replace Text",
+                               MessageBoxButtons.YesNo, MessageBoxIcon.Question) != DialogResult.Yes: return False
+
             # Start transaction to replace text
+            occurrences, changed = 0, 0
             t = Transaction(doc, "Replace Text Notes")
             t.Start()
-            for note in matching: note.Text = replaceWith
+            for note in changing:
+                if pattern: count = replaceInNote(note, pattern, replaceWith, expand)
+                else:
+                    note.Text = replaceWith
+                    count = 1
+                occurrences += count
+                if count: changed += 1
             t.Commit()
+            self.clearTextValues()
 
-            MessageBox.Show("Replaced text in {} text note(s).".format(len(matching)), "Replace Complete", MessageBoxButtons.OK, MessageBoxIcon.Information)
+            MessageBox.Show("Replaced {} occurrence(s) in {} text note(s).".format(occurrences, changed), "Replace Complete", MessageBoxButtons.OK, MessageBoxIcon.Information)
             return True
 
         except Exception as e:
@@ -1,4 +1,4 @@
-import clr, os
+import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 clr.AddReference('System.Windows.Forms')
@@ -11,81 +11,39 @@ from Autodesk.Revit.ApplicationServices import Application
 from System.Windows.Forms import *
 from System.Drawing import *
 from Autodesk.Revit.UI.Selection import ObjectType
-
-paramName = "Revitesse Old Marks"
-paramGroupName = "Revitesse"
+from System.Collections.Generic import List
+from revitesse import idValue
+from revitesse.parameters import getMarkParameterId
+from revitesse.snapshots import saveMarkSnapshot
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
 app = doc.Application
 uiapp = __revit__
 
-bindings = doc.ParameterBindings
-
-def isParameterBound(parameterName):
-    # Check if shared parameter is already bound
-    it = bindings.ForwardIterator()
-    it.Reset()
-    while it.MoveNext():
-        if it.Key.Name.strip().lower() == parameterName.strip().lower(): return True
-    return False
-
-def createAndBindParameter(paramName, paramGroupName):
-    # Create a shared parameter and bind to all categories
-    sharedParameterFilePath = app.SharedParametersFilename
-    sharedParameterFile = app.OpenSharedParameterFile()
-    # If there is no shared parameter file, create a new one in the same folder of the Revit file
-    if not sharedParameterFilePath or not sharedParameterFile:
-        revitPath = doc.PathName
-        folder = os.path.dirname(revitPath) if revitPath else os.environ.get("TEMP")
-        sharedParameterFilePath = os.path.join(folder, "sharedParameters.txt")
-        if not os.path.exists(sharedParameterFilePath):
-            with open(sharedParameterFilePath, 'w'): pass
-
-        app.SharedParametersFilename = sharedParameterFilePath
-        sharedParameterFile = app.OpenSharedParameterFile()
-        if not sharedParameterFile:
-            MessageBox.Show("Unable to create or open shared parameter file.", "Error")
-            return None
-
-    # Get or create group
-    group = next((g for g in sharedParameterFile.Groups if g.Name == paramGroupName), None)
-    if not group: group = sharedParameterFile.Groups.Create(paramGroupName)
-    # Get or create definition
-    definition = next((d for d in group.Definitions if d.Name == paramName), None)
-    if not definition:
-        opt = ExternalDefinitionCreationOptions(paramName, SpecTypeId.String.Text)
-        definition = group.Definitions.Create(opt)
-    # Bind to all categories that allow binding
-    categories = CategorySet()
-    for cat in doc.Settings.Categories:
-        if cat.AllowsBoundParameters: categories.Insert(cat)
-
-    binding = InstanceBinding(categories)
-
-    t1 = Transaction(doc, "Bind Parameter")
-    t1.Start()
-    from Autodesk.Revit.DB import GroupTypeId
-    if not isParameterBound(definition.Name):
-        success = bindings.Insert(definition, binding, GroupTypeId.IdentityData)
-        if not success: bindings.ReInsert(definition, binding, GroupTypeId.IdentityData)
-    else: bindings.ReInsert(definition, binding, GroupTypeId.IdentityData)
-    t1.Commit()
-    return definition
-
-def getTargetElements(scope, sourceElement):
-    # Return elements to process based on scope and selected element.
-    categoryId = sourceElement.Category.Id
+chunkSize = 500
+pickScopes = ["Only this element", "All instances of the same category visible in view", "All instances of the same category in entire project"]
+selectionScope = "Current selection"
+categoryScopes = ["Chosen categories visible in view", "Chosen categories in entire project"]
+
+# Elements of the categories, collected by one multi-category filter
+def collectCategoryElements(categoryIds, inView):
+    collector = FilteredElementCollector(doc, doc.ActiveView.Id) if inView else FilteredElementCollector(doc)
+    categoryFilter = ElementMulticategoryFilter(List[ElementId](categoryIds))
+    return list(collector.WherePasses(categoryFilter).WhereElementIsNotElementType())
+
+def getTargetElements(scope, sourceElement=None, categoryIds=None):
+    # Return elements to process based on scope and selected element or categories.
     if scope == "Only this element": return [sourceElement]
-    elif scope == "All instances of the same category visible in view":
-        return [e for e in FilteredElementCollector(doc, doc.ActiveView.Id).WhereElementIsNotElementType() if e.Category and e.Category.Id == categoryId]
-    elif scope == "All instances of the same category in entire project":
-        return [e for e in FilteredElementCollector(doc).WhereElementIsNotElementType() if e.Category and e.Category.Id == categoryId]
+    elif scope == "All instances of the same category visible in view": return collectCategoryElements([sourceElement.Category.Id], True)
+    elif scope == "All instances of the same category in entire project": return collectCategoryElements([sourceElement.Category.Id], False)
+    elif scope == selectionScope: return [doc.GetElement(i) for i in uidoc.Selection.GetElementIds()]
+    elif scope in categoryScopes: return collectCategoryElements(categoryIds, scope == categoryScopes[0])
     return [sourceElement]
 
 # UI Form
 class ResetMarksForm(Form):
-    def __init__(self):
+    def __init__(self, hasSelection):
         self.Text = "Reset Marks"
         self.Size = Size(400, 190)
         self.StartPosition = FormStartPosition.CenterScreen
@@ -101,14 +59,13 @@ class ResetMarksForm(Form):
             self.Controls.Add(ctrl)
             return ctrl
 
-        self.backupCheckbox = addCtrl(CheckBox, "Backup old marks", 20, 20, 200, 25)
+        self.backupCheckbox = addCtrl(CheckBox, "Snapshot old marks", 20, 20, 200, 25)
 
         self.scopeLabel = addCtrl(Label, "Scope:", 20, 60, 50, 25)
         self.scopeCombo = addCtrl(ComboBox, None, 80, 60, 295, 25, DropDownStyle=ComboBoxStyle.DropDownList)
-        self.scopeCombo.Items.Add("Only this element")
-        self.scopeCombo.Items.Add("All instances of the same category visible in view")
-        self.scopeCombo.Items.Add("All instances of the same category in entire project")
-        self.scopeCombo.SelectedIndex = 0
+        for scope in pickScopes + categoryScopes: self.scopeCombo.Items.Add(scope)
+        if hasSelection: self.scopeCombo.Items.Add(selectionScope)
+        self.scopeCombo.SelectedIndex = self.scopeCombo.Items.Count - 1 if hasSelection else 0
 
         self.cancelButton = addCtrl(Button, "Cancel", 220, 110, 75, 30)
         self.cancelButton.Click += self.cancelClicked
@@ -124,42 +81,64 @@ class ResetMarksForm(Form):
         self.Close()
 
 # Main reset function
-def resetMarks(sourceElement, backupOldMarks, scope):
-    elements = getTargetElements(scope, sourceElement)
-
-    if not elements:
-        MessageBox.Show("No elements found in selected scope.", "Info")
+def resetMarks(elements, backupOldMarks):
+    # One mark accessor per category, and only marks that are not already empty
+    markParameterIds = {}
+    targets = []
+    for e in elements:
+        if not e or not e.Category: continue
+        categoryId = idValue(e.Category.Id)
+        if categoryId not in markParameterIds: markParameterIds[categoryId] = getMarkParameterId(e.Category.Id)
+        markParam = e.get_Parameter(markParameterIds[categoryId])
+        if markParam and not markParam.IsReadOnly and markParam.AsString(): targets.append((e, markParam, markParameterIds[categoryId]))
+
+    if not targets:
+        MessageBox.Show("No marks to reset in selected scope.", "Info")
         return
 
+    # Old marks go to an external snapshot that Restore Marks can bring back
     if backupOldMarks:
-        definition = createAndBindParameter(paramName, paramGroupName)
-        if not definition:
-            MessageBox.Show("Failed to create or bind backup parameter.", "Error")
+        try: saveMarkSnapshot(doc, [(e, markParameterId) for e, markParam, markParameterId in targets], "Reset Marks")
+        except Exception as ex:
+            MessageBox.Show("Failed to save the marks snapshot:\n{}".format(str(ex)), "Error")
             return
 
-    t2 = Transaction(doc, "Reset Marks")
-    t2.Start()
-    for e in elements:
-        if backupOldMarks:
-            oldMark = e.get_Parameter(BuiltInParameter.ALL_MODEL_MARK)
-            backupParam = e.LookupParameter(paramName)
-            if oldMark and backupParam: backupParam.Set(oldMark.AsString() or "")
-
-        markParam = e.get_Parameter(BuiltInParameter.ALL_MODEL_MARK)
-        if markParam and not markParam.IsReadOnly: markParam.Set("")
-    t2.Commit()
-    MessageBox.Show("Marks reset for {} elements.".format(len(elements)), "Success")
+    # Chunked transactions keep Revit responsive on whole-project resets, rolled back as a whole if anything escapes
+    resetCount = 0
+    tg = TransactionGroup(doc, "Reset Marks")
+    tg.Start()
+    t2 = None
+    try:
+        with forms.ProgressBar(title="Resetting marks ({value} of {max_value})", cancellable=True) as pb:
+            for start in range(0, len(targets), chunkSize):
+                if pb.cancelled: break
+                t2 = Transaction(doc, "Reset Marks")
+                t2.Start()
+                for e, markParam, markParameterId in targets[start:start + chunkSize]: markParam.Set("")
+                t2.Commit()
+                resetCount = min(start + chunkSize, len(targets))
+                pb.update_progress(resetCount, len(targets))
+        tg.Assimilate()
+    finally:
+        if t2 and t2.HasStarted() and not t2.HasEnded(): t2.RollBack()
+        if not tg.HasEnded(): tg.RollBack()
+    MessageBox.Show("Marks reset for {} elements.".format(resetCount), "Success")
 
 # Entry point
-try:
-    with forms.WarningBar(title="Select exactly one element"):
-        pickedObject = uidoc.Selection.PickObject(ObjectType.Element)
-        sourceElement = doc.GetElement(pickedObject.ElementId)
-except: forms.alert("No element selected.", exitscript=True)
-
-form = ResetMarksForm()
-result = form.ShowDialog()
-if result == DialogResult.OK:
+form = ResetMarksForm(uidoc.Selection.GetElementIds().Count > 0)
+if form.ShowDialog() == DialogResult.OK:
     backup = form.backupCheckbox.Checked
     scopeChoice = form.scopeCombo.SelectedItem
-    resetMarks(sourceElement, backup, scopeChoice)
\ No newline at end of file
+    sourceElement, categoryIds = None, None
+    if scopeChoice in pickScopes:
+        try:
+            with forms.WarningBar(title="Select exactly one element"):
+                pickedObject = uidoc.Selection.PickObject(ObjectType.Element)
+                sourceElement = doc.GetElement(pickedObject.ElementId)
+        except: forms.alert("No element selected.", exitscript=True)
+    elif scopeChoice in categoryScopes:
+        modelCategories = dict((cat.Name, cat.Id) for cat in doc.Settings.Categories if cat.CategoryType == CategoryType.Model)
+        chosenNames = forms.SelectFromList.show(sorted(modelCategories.keys()), title="Select Categories to Reset", multiselect=True)
+        if not chosenNames: forms.alert("No categories selected.", exitscript=True)
+        categoryIds = [modelCategories[name] for name in chosenNames]
+    resetMarks(getTargetElements(scopeChoice, sourceElement, categoryIds), backup)
\ No newline at end of file
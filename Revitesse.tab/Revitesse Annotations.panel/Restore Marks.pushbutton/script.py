@@ -0,0 +1,27 @@
+from pyrevit import revit, forms, script
+from revitesse import idValue
+from revitesse.snapshots import listMarkSnapshots, diffMarkSnapshot, restoreMarkDifferences
+
+doc = revit.doc
+
+# 1. Snapshot to restore, newest first
+snapshots = listMarkSnapshots(doc)
+if not snapshots: forms.alert("No mark snapshots found for this model.", exitscript=True)
+labels = ["{} - {}".format(header.get("created"), header.get("label")) for path, header in snapshots]
+chosenLabel = forms.SelectFromList.show(labels, title="Restore Marks From Snapshot", multiselect=False)
+if not chosenLabel: script.exit()
+snapshotPath = snapshots[labels.index(chosenLabel)][0]
+
+# 2. Marks that differ from the snapshot
+differences, missing = diffMarkSnapshot(doc, snapshotPath)
+missingNote = "{} elements of the snapshot no longer exist.".format(missing) if missing else ""
+if not differences: forms.alert("All marks already match the snapshot.", sub_msg=missingNote, exitscript=True)
+
+sample = "\n".join("{}: '{}' -> '{}'".format(idValue(elem.Id), current, mark) for elem, parameter, mark, current in differences[:25])
+if len(differences) > 25: sample += "\n..."
+if missingNote: sample += "\n\n" + missingNote
+if not forms.alert("{} marks differ from the snapshot. Restore them?".format(len(differences)), sub_msg=sample, yes=True, no=True): script.exit()
+
+# 3. Write back only the differing marks
+restoreMarkDifferences(doc, differences)
+forms.alert("{} marks restored.".format(len(differences)))
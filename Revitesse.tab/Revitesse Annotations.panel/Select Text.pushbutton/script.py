@@ -1,3 +1,6 @@
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -10,6 +13,7 @@ from System.Windows.Forms import *
 from System.Drawing import *
 from System.Collections.Generic import List
 from System import Array, Object
+from revitesse.textnotes import getTextNoteIndex, getScopeViewIds
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
@@ -61,8 +65,11 @@ class TextSelectorForm(Form):
         # Events
         self.exactRadio.CheckedChanged += lambda s, e: self.toggleControls()
         self.containsRadio.CheckedChanged += lambda s, e: self.toggleControls()
+        self.spaceCombo.SelectedIndexChanged += lambda s, e: self.clearTextValues()
+        self.exactCombo.DropDown += lambda s, e: self.populateTextValues()
 
-        self.populateTextValues()
+        # Exact values are filled on first drop down, for the chosen scope only
+        self.textValuesScope = None
 
     def createLabel(self, text, x, y):
         label = Label()
@@ -98,24 +105,26 @@ class TextSelectorForm(Form):
         return button
 
     def populateTextValues(self):
-        collector = FilteredElementCollector(doc)
-        textNotes = collector.OfCategory(BuiltInCategory.OST_TextNotes).WhereElementIsNotElementType().ToElements()
-        # Get unique, non-system text values
-        textValues = set()
-        for note in textNotes:
-            if hasattr(note, 'Text') and note.Text:
-                text = note.Text.strip()
-                if text and not self.isSystemText(text): textValues.add(text)
-
-        sortedValues = sorted(textValues)
-        netArray = Array[Object](sortedValues)
-        self.exactCombo.Items.AddRange(netArray)
-        if sortedValues: self.exactCombo.SelectedIndex = 0
-
-    def isSystemText(self, text):
-        return (len(text) > 150 or
-                '123456789' in text.replace(' ', '') or
-                sum(1 for w in text.split() if len(w) == 1 and w.isalpha()) > 10)
+        scope = self.spaceCombo.SelectedItem
+        if self.textValuesScope == scope: return
+        self.textValuesScope = scope
+        index = getTextNoteIndex(doc)
+        sortedValues = index.getTextValues(getScopeViewIds(doc, scope))
+        self.exactCombo.Items.Clear()
+        self.exactCombo.Items.AddRange(Array[Object](sortedValues))
+
+    def clearTextValues(self):
+        self.textValuesScope = None
+        self.exactCombo.Items.Clear()
+
+    # Ids of the text notes matching the chosen scope and filter
+    def getMatchingNoteIds(self):
+        index = getTextNoteIndex(doc)
+        viewIds = getScopeViewIds(doc, self.spaceCombo.SelectedItem)
+        if self.exactRadio.Checked and self.exactCombo.SelectedItem: return index.findExact(str(self.exactCombo.SelectedItem), viewIds)
+        contains = self.containsText.Text
+        if contains and contains != "<None>": return index.findContains(contains, viewIds)
+        return []
 
     def toggleControls(self):
         self.exactCombo.Enabled = self.exactRadio.Checked
@@ -133,21 +142,9 @@ class TextSelectorForm(Form):
 
     def selectButton(self, sender, args):
         try:
-            # Get text notes based on scope
-            if self.spaceCombo.SelectedItem == "Active View": collector = FilteredElementCollector(doc, doc.ActiveView.Id)
-            else: collector = FilteredElementCollector(doc)
-            textNotes = collector.OfCategory(BuiltInCategory.OST_TextNotes).WhereElementIsNotElementType().ToElements()
-            # Filter notes
-            if self.exactRadio.Checked and self.exactCombo.SelectedItem:
-                target = str(self.exactCombo.SelectedItem)
-                matching = [n for n in textNotes if n.Text and n.Text.strip() == target]
-            else:
-                contains = self.containsText.Text
-                if contains and contains != "<None>": matching = [n for n in textNotes if n.Text and contains.lower() in n.Text.lower()]
-                else: matching = []
-
+            matching = self.getMatchingNoteIds()
             if matching:
-                elementIds = List[ElementId]([n.Id for n in matching])
+                elementIds = List[ElementId]([ElementId(i) for i in matching])
                 uidoc.Selection.SetElementIds(elementIds)
                 MessageBox.Show("Selected {} text note(s).".format(len(matching)), "Selection Complete", MessageBoxButtons.OK, MessageBoxIcon.Information)
 
@@ -0,0 +1,55 @@
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
+from pyrevit import revit, DB, forms
+from System.Collections.Generic import List
+from revitesse.textnotes import getTextNoteIndex
+from revitesse.similarity import clusterSimilarTexts
+
+doc = revit.doc
+uidoc = revit.uidoc
+
+maximumLabelLength = 120
+
+def getLabel(noteCount, variants):
+    label = "{} notes, {} variants: {}".format(noteCount, len(variants), " | ".join(v.replace("\r", " ").replace("\n", " ") for v in variants))
+    return label if len(label) <= maximumLabelLength else label[:maximumLabelLength - 3] + "..."
+
+# 1. Cluster the distinct texts of the model
+index = getTextNoteIndex(doc)
+texts = [k for k in index.byText if k and not index.isSystemText(k)]
+clusters = clusterSimilarTexts(texts)
+if not clusters: forms.alert("No similar text notes found.", exitscript=True)
+
+# 2. Report clusters with their note counts, largest first
+clustersByLabel = {}
+labels = []
+for variants in clusters:
+    variants.sort(key=lambda v: -len(index.byText[v]))
+    noteCount = sum(len(index.byText[v]) for v in variants)
+    label = getLabel(noteCount, variants)
+    while label in clustersByLabel: label += " "
+    clustersByLabel[label] = (noteCount, variants)
+    labels.append(label)
+labels.sort(key=lambda l: -clustersByLabel[l][0])
+
+chosenLabel = forms.SelectFromList.show(labels, title="{} Clusters of Similar Text Notes".format(len(labels)), multiselect=False)
+if not chosenLabel: forms.alert("No cluster selected.", exitscript=True)
+noteCount, variants = clustersByLabel[chosenLabel]
+noteIds = [i for v in variants for i in index.byText[v]]
+
+# 3. Select the cluster or replace it with a canonical text
+action = forms.CommandSwitchWindow.show(["Select Notes", "Replace with Standard Text"], message="{} text notes in this cluster.".format(noteCount))
+if not action: forms.alert("Operation cancelled.", exitscript=True)
+
+if action == "Select Notes":
+    uidoc.Selection.SetElementIds(List[DB.ElementId]([DB.ElementId(i) for i in noteIds]))
+else:
+    canonical = forms.ask_for_string(default=variants[0], prompt="Standard text for the {} notes:".format(noteCount), title="Replace with Standard Text")
+    if not canonical: forms.alert("Operation cancelled.", exitscript=True)
+    changed = [i for v in variants if v != canonical for i in index.byText[v]]
+    t = DB.Transaction(doc, "Standardize Text Notes")
+    t.Start()
+    for noteId in changed: doc.GetElement(DB.ElementId(noteId)).Text = canonical
+    t.Commit()
+    forms.alert("Replaced text in {} text note(s).".format(len(changed)))
@@ -1,11 +1,11 @@
-from pyrevit import revit, DB, forms
-from Autodesk.Revit.UI.Selection import ObjectType
-import clr, sys, os
+from pyrevit import revit, DB, forms, script
+import clr, os, json
 
 clr.AddReference('PresentationFramework')
 clr.AddReference('PresentationCore')
 from System.Windows import Window, Thickness, HorizontalAlignment, WindowStartupLocation, TextWrapping
 from System.Windows.Controls import StackPanel, ComboBox, Label, Button, Orientation, TextBox, TextBlock
+from revitesse.parameters import getCategoryParameterIds, getParameterAccessor
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = revit.uidoc
@@ -14,6 +14,7 @@ app = doc.Application
 paramGroupName = "Revitesse"
 parameterName = "Revitesse Combined Parameters"
 maximumRows = 5
+config = script.get_config()
 
 # Check if a parameter is already bound to model categories
 def isParameterBound(parameterName):
@@ -64,26 +65,22 @@ def bindSharedParameter():
     return definition
 
 # Get all parameters for a given category, sorted, including "<None>" option
-def getCategoryParameters(category):
-    params = set()
-    collector = DB.FilteredElementCollector(doc).OfCategoryId(category.Id).WhereElementIsNotElementType()
-    for elem in collector:
-        for p in elem.Parameters:
-            if p.Definition and p.Definition.Name: params.add(p.Definition.Name)
-    parameterList = sorted(params)
+def getCategoryParameters(parameterIds):
+    parameterList = sorted(parameterIds.keys())
     parameterList.insert(0, "<None>")
     return parameterList
 
 # Window class for the combine parameters UI
 class CombineParamsForm(Window):
-    def __init__(self, category):
-        self.Title = "Combine Parameters"
+    def __init__(self, category, parameterIds, recipe=None):
+        self.Title = "Combine Parameters - {}".format(category.Name)
         self.Width, self.Height = 630, 330
         self.WindowStartupLocation = WindowStartupLocation.CenterScreen
         self.Topmost = True
 
         self.category = category
-        self.paramNames = getCategoryParameters(category)
+        self.paramNames = getCategoryParameters(parameterIds)
+        savedParameters, savedSeparators = recipe if recipe else ([], [])
 
         panel = StackPanel()
         panel.Margin = Thickness(10)
@@ -100,6 +97,7 @@ class CombineParamsForm(Window):
 
             combo = ComboBox(ItemsSource=self.paramNames, Width=220)
             combo.SelectedIndex = 0
+            if i < len(savedParameters) and savedParameters[i] in self.paramNames: combo.SelectedItem = savedParameters[i]
             rowPanel.Children.Add(combo)
             self.paramCombos.append(combo)
 
@@ -109,12 +107,13 @@ class CombineParamsForm(Window):
             rowPanel.Children.Add(labelSep)
 
             txt = TextBox(Width=100)
+            if i < len(savedSeparators) and savedSeparators[i] != " ": txt.Text = savedSeparators[i]
             rowPanel.Children.Add(txt)
             self.sepTextboxes.append(txt)
 
             panel.Children.Add(rowPanel)
 
-        infoText = TextBlock(Text="At least two parameters must be selected.\nIf separator is empty, a space will be used.", 
+        infoText = TextBlock(Text="At least two parameters must be selected.\nIf separator is empty, a space will be used. Cancel skips this category.", 
                              Margin=Thickness(0,10,0,10), TextWrapping=TextWrapping.Wrap)
         panel.Children.Add(infoText)
 
@@ -149,12 +148,7 @@ class CombineParamsForm(Window):
         self.result = None
         self.DialogResult = False
 
-def getParameterValue(elem, param_name):
-    param = None
-    for p in elem.Parameters:
-        if p.Definition and p.Definition.Name == param_name:
-            param = p
-            break
+def getParameterValue(param):
     if not param: return ""
     try:
         val = param.AsString()
@@ -163,51 +157,99 @@ def getParameterValue(elem, param_name):
         return val
     except:  return ""
 
-def main():
-    try:
-        with forms.WarningBar(title="Select one element to use as reference for category"):
-            picked = uidoc.Selection.PickObject(ObjectType.Element, "Pick an element")
-            referenceElement = doc.GetElement(picked.ElementId)
-    except:
-        forms.alert("Selection cancelled.", exitscript=True)
-        sys.exit()
-
-    category = referenceElement.Category
-    if not category:
-        forms.alert("Selected element has no category.", exitscript=True)
-        sys.exit()
-
-    bindSharedParameter()
+# Saved recipes: {category name: [parameter names, separators]}
+def loadRecipes():
+    try: return json.loads(config.get_option("recipes", "{}"))
+    except: return {}
 
-    form = CombineParamsForm(category)
-    if not form.ShowDialog():
-        forms.alert("Operation cancelled.", exitscript=True)
-        sys.exit()
-
-    selectedParameters, separators = form.result
-
-    collector = DB.FilteredElementCollector(doc).OfCategoryId(category.Id).WhereElementIsNotElementType()
+def saveRecipes(recipes):
+    config.recipes = json.dumps(recipes)
+    script.save_config()
 
+def getRecipeCategories():
+    categories = []
+    for cat in doc.Settings.Categories:
+        try:
+            if cat.AllowsBoundParameters and cat.CategoryType in (DB.CategoryType.Model, DB.CategoryType.Annotation): categories.append(cat)
+        except: pass
+    return sorted(categories, key=lambda c: c.Name)
+
+# Ask for a recipe per chosen category, returns {category name: (parameters, separators)}
+def defineRecipes(categoriesByName, savedRecipes):
+    chosenNames = forms.SelectFromList.show(sorted(categoriesByName.keys()), title="Select Categories to Combine", multiselect=True)
+    if not chosenNames: return {}
+    recipes = {}
+    for name in chosenNames:
+        category = categoriesByName[name]
+        form = CombineParamsForm(category, getCategoryParameterIds(doc, category), savedRecipes.get(name))
+        if form.ShowDialog() and form.result: recipes[name] = form.result
+    return recipes
+
+# Build one accessor plan per category: the source getters, the separators and the target getter
+def buildPlans(recipes, categoriesByName):
+    plans, skipped = [], []
+    for name, (selectedParameters, separators) in sorted(recipes.items()):
+        category = categoriesByName.get(name)
+        if not category:
+            skipped.append(name)
+            continue
+        parameterIds = getCategoryParameterIds(doc, category)
+        missing = [p for p in selectedParameters if p not in parameterIds]
+        if missing:
+            skipped.append("{} (missing: {})".format(name, ", ".join(missing)))
+            continue
+        accessors = [getParameterAccessor(doc, parameterIds[p], fromType=True) for p in selectedParameters]
+        plans.append((category, accessors, separators))
+    return plans, skipped
+
+def combineCategory(category, accessors, separators, targetGuid):
     combinedCount = 0
-    t = DB.Transaction(doc, "Combine Parameters into '{}'".format(parameterName))
-    t.Start()
+    collector = DB.FilteredElementCollector(doc).OfCategoryId(category.Id).WhereElementIsNotElementType()
+    lastIndex = len(accessors) - 1
     for elem in collector:
+        # A same-named parameter bound before this file was used has another GUID
+        combinedParameters = elem.get_Parameter(targetGuid) or elem.LookupParameter(parameterName)
+        if not combinedParameters or combinedParameters.IsReadOnly: continue
         combinedValues = []
-        for i, param_name in enumerate(selectedParameters):
-            val = getParameterValue(elem, param_name)
-            combinedValues.append(val)
-            if i < len(selectedParameters) - 1:  combinedValues.append(separators[i])
+        for i, accessor in enumerate(accessors):
+            combinedValues.append(getParameterValue(accessor(elem)))
+            if i < lastIndex: combinedValues.append(separators[i])
         combinedText = "".join(combinedValues).strip()
+        # Only values that actually change are written and counted
+        if (combinedParameters.AsString() or "") == combinedText: continue
+        if combinedParameters.Set(combinedText): combinedCount += 1
+    return combinedCount
+
+def main():
+    categoriesByName = {c.Name: c for c in getRecipeCategories()}
+    savedRecipes = loadRecipes()
+
+    action = "Define Recipes"
+    if savedRecipes:
+        action = forms.CommandSwitchWindow.show(["Run Saved Recipes", "Define Recipes"],
+                                                message="Saved recipes: {}".format(", ".join(sorted(savedRecipes.keys()))))
+        if not action: forms.alert("Operation cancelled.", exitscript=True)
+
+    if action == "Run Saved Recipes": recipes = savedRecipes
+    else:
+        recipes = defineRecipes(categoriesByName, savedRecipes)
+        if not recipes: forms.alert("Operation cancelled.", exitscript=True)
+        savedRecipes.update(recipes)
+        saveRecipes(savedRecipes)
+
+    definition = bindSharedParameter()
+    plans, skipped = buildPlans(recipes, categoriesByName)
+    if not plans: forms.alert("No recipe could be applied in this model.", exitscript=True)
 
-        combinedParameters = None
-        for p in elem.Parameters:
-            if p.Definition and p.Definition.Name == parameterName:
-                combinedParameters = p
-                break
-        if combinedParameters and not combinedParameters.IsReadOnly:
-            combinedParameters.Set(combinedText)
-            combinedCount += 1
+    combinedCount = 0
+    t = DB.Transaction(doc, "Combine Parameters into '{}'".format(parameterName))
+    t.Start()
+    for category, accessors, separators in plans:
+        combinedCount += combineCategory(category, accessors, separators, definition.GUID)
     t.Commit()
-    forms.alert("{} elements updated with combined parameters.".format(combinedCount), title="Done")
+
+    message = "{} elements in {} categories updated with combined parameters.".format(combinedCount, len(plans))
+    if skipped: message += "\n\nSkipped:\n" + "\n".join(skipped)
+    forms.alert(message, title="Done")
 
 if __name__ == "__main__": main()
\ No newline at end of file
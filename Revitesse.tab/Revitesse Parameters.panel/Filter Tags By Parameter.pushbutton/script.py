@@ -6,6 +6,8 @@ from System.Windows import Window, Thickness, WindowStartupLocation
 from System.Windows.Controls import StackPanel, ComboBox, Label, Button, Orientation
 from System.Collections.Generic import List
 from Autodesk.Revit.DB import ElementId
+from revitesse import idValue
+from revitesse.tags import TagIndex
 
 # Get parameter by name
 def getParameterByName(elem, name):
@@ -19,27 +21,6 @@ def getParameterValue(p):
     try: return p.AsValueString() or p.AsString() or str(p.AsInteger())
     except: return ""
 
-# Find tags for a given element
-def getTagsForElement(element, scope):
-    #Find all tags that reference the given element
-    tags = []
-    # Get tag collector based on scope
-    if scope == "Active View": tagCollector = DB.FilteredElementCollector(revit.doc, revit.doc.ActiveView.Id).OfClass(DB.IndependentTag)
-    else: tagCollector = DB.FilteredElementCollector(revit.doc).OfClass(DB.IndependentTag)
-    
-    for tag in tagCollector:
-        try:
-            # Get the tagged element IDs
-            taggedElementIds = tag.GetTaggedLocalElementIds()
-            if taggedElementIds.Count > 0:
-                # Check if any of the tagged elements match target element
-                for taggedId in taggedElementIds:
-                    if taggedId == element.Id:
-                        tags.append(tag)
-                        break
-        except: continue  
-    return tags
-
 # User selects an element to define the category to filter on
 try:
     with forms.WarningBar(title="Select one element to filter the category of"):
@@ -55,11 +36,30 @@ categoryId = sourceElement.Category.Id
 allElements = DB.FilteredElementCollector(revit.doc).WhereElementIsNotElementType().ToElements()
 categoryElements = [e for e in allElements if e.Category and e.Category.Id == categoryId]
 
+# Elements of the same category in loaded links, as (link instance id, element), so tags on linked elements are found too
+linkedCategoryElements = []
+for link in DB.FilteredElementCollector(revit.doc).OfClass(DB.RevitLinkInstance):
+    linkDoc = link.GetLinkDocument()
+    if not linkDoc: continue
+    for e in DB.FilteredElementCollector(linkDoc).OfCategoryId(categoryId).WhereElementIsNotElementType(): linkedCategoryElements.append((link.Id, e))
+
+# Linked elements in scope: with a view, only links shown in it and, where Revit supports it (2024+), only their elements shown in it
+def getLinkedCandidates(viewId):
+    if not viewId: return linkedCategoryElements
+    candidates = []
+    for link in DB.FilteredElementCollector(revit.doc, viewId).OfClass(DB.RevitLinkInstance):
+        linkDoc = link.GetLinkDocument()
+        if not linkDoc: continue
+        try: collector = DB.FilteredElementCollector(revit.doc, viewId, link.Id)
+        except: collector = DB.FilteredElementCollector(linkDoc)
+        for e in collector.OfCategoryId(categoryId).WhereElementIsNotElementType(): candidates.append((link.Id, e))
+    return candidates
+
 # Collect all parameter names and their distinct values from these elements
 parameterNames = []
 parameterValuesByName = {}
 
-for e in categoryElements:
+for e in categoryElements + [e for _, e in linkedCategoryElements]:
     for p in e.Parameters:
         if p.Definition:
             name = p.Definition.Name
@@ -145,7 +145,8 @@ if not form.result:
 action, (paramName, paramValue, scope) = form.result
 
 # Choose scope of elements to filter
-if scope == "Active View": elemsToFilter = DB.FilteredElementCollector(revit.doc, revit.doc.ActiveView.Id).WhereElementIsNotElementType()
+scopeViewId = revit.doc.ActiveView.Id if scope == "Active View" else None
+if scopeViewId: elemsToFilter = DB.FilteredElementCollector(revit.doc, scopeViewId).WhereElementIsNotElementType()
 else: elemsToFilter = DB.FilteredElementCollector(revit.doc).WhereElementIsNotElementType()
 
 # Filter elements by category and parameter value
@@ -155,39 +156,48 @@ for e in elemsToFilter:
         p = getParameterByName(e, paramName)
         if getParameterValue(p) == paramValue: matchedElements.append(e)
 
-if not matchedElements:
+matchedLinkedElements = [(linkId, e) for linkId, e in getLinkedCandidates(scopeViewId) if getParameterValue(getParameterByName(e, paramName)) == paramValue]
+
+if not matchedElements and not matchedLinkedElements:
     forms.alert("No matching elements found.")
     sys.exit()
 
 # Find tags for the matched elements
-allTags = []
+tagIndex = TagIndex(revit.doc, scopeViewId)
+allTagIds = []
+seenTagIds = set()
 elementsWithTags = []
-for element in matchedElements:
-    tags = getTagsForElement(element, scope)
-    if tags:
-        allTags.extend(tags)
-        elementsWithTags.append(element)
-
-if not allTags:
-    forms.alert("No tags found for the {} matching elements.".format(len(matchedElements)))
+matchedCount = len(matchedElements) + len(matchedLinkedElements)
+for linkId, element in [(None, e) for e in matchedElements] + matchedLinkedElements:
+    tagEntries = tagIndex.tagsForElement(element.Id, linkId)
+    if not tagEntries: continue
+    elementsWithTags.append(element)
+    for tagId, ownerViewId in tagEntries:
+        if idValue(tagId) in seenTagIds: continue
+        seenTagIds.add(idValue(tagId))
+        allTagIds.append(tagId)
+
+if not allTagIds:
+    forms.alert("No tags found for the {} matching elements.".format(matchedCount))
     sys.exit()
 
 # Select the tags instead of the elements
-tagIds = List[ElementId]([tag.Id for tag in allTags])
+tagIds = List[ElementId](allTagIds)
 revit.uidoc.ShowElements(tagIds)
 revit.uidoc.Selection.SetElementIds(tagIds)
 
-forms.alert("Found {} tags for {} elements (out of {} matching elements).".format(len(allTags), len(elementsWithTags), len(matchedElements)))
+forms.alert("Found {} tags for {} elements (out of {} matching elements).".format(len(allTagIds), len(elementsWithTags), matchedCount))
 
 # Export CSV if requested
 if action == "export":
     csvPath = forms.save_file(file_ext='csv', title="Save CSV file")
     if csvPath:
-        allParams = sorted({p.Definition.Name for e in matchedElements for p in e.Parameters if p.Definition})
+        exportElements = matchedElements + [e for _, e in matchedLinkedElements]
+        allParams = sorted({p.Definition.Name for e in exportElements for p in e.Parameters if p.Definition})
         with open(csvPath, 'w') as f:
             writer = csv.writer(f)
             writer.writerow(allParams)
-            for e in matchedElements:
+            for e in exportElements:
                 row = []
                 for pname in allParams:
                     p = getParameterByName(e, pname)
@@ -0,0 +1,105 @@
+from pyrevit import revit, DB, forms
+from revitesse import idValue
+from revitesse.tags import TagIndex, getUntaggedInView, selectTargetViews, getTagCategoryIds
+
+doc = revit.doc
+
+# Number of tags created per transaction
+chunkSize = 200
+
+# Point to place the tag at: location point, curve midpoint, or bounding box center in the view
+def getTagPoint(elem, view):
+    location = elem.Location
+    if isinstance(location, DB.LocationPoint): return location.Point
+    if isinstance(location, DB.LocationCurve): return location.Curve.Evaluate(0.5, True)
+    box = elem.get_BoundingBox(view) or elem.get_BoundingBox(None)
+    if box: return (box.Min + box.Max) / 2.0
+    return None
+
+# Tag types whose category can tag the chosen category
+def getTagTypes(categoryId):
+    tagCategoryIds = getTagCategoryIds(categoryId)
+    tagTypes = {}
+    for symbol in DB.FilteredElementCollector(doc).OfClass(DB.FamilySymbol):
+        category = symbol.Category
+        if not category or not category.IsTagCategory or idValue(category.Id) not in tagCategoryIds: continue
+        typeName = symbol.get_Parameter(DB.BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
+        tagTypes["{} : {} : {}".format(category.Name, symbol.FamilyName, typeName)] = symbol
+    return tagTypes
+
+# Place tags for one view's elements, returns the number of tags created and adds (element id, reason) to failures
+def tagElements(view, elementIds, tagTypeId, failures):
+    created = 0
+    for elementId in elementIds:
+        elem = doc.GetElement(elementId)
+        point = getTagPoint(elem, view)
+        if not point:
+            failures.append((elementId, "no location to place the tag at"))
+            continue
+        try:
+            DB.IndependentTag.Create(doc, tagTypeId, view.Id, DB.Reference(elem), False, DB.TagOrientation.Horizontal, point)
+            created += 1
+        except Exception as e: failures.append((elementId, str(e)))
+    return created
+
+# 1. Category and tag type
+modelCategories = [cat for cat in doc.Settings.Categories if cat.CategoryType == DB.CategoryType.Model]
+categoryNameToCategory = {cat.Name: cat for cat in modelCategories}
+chosenCategoryName = forms.SelectFromList.show(sorted(categoryNameToCategory.keys()), title="Select Category to Tag", multiselect=False)
+if not chosenCategoryName: forms.alert("No category selected.", exitscript=True)
+categoryId = categoryNameToCategory[chosenCategoryName].Id
+
+tagTypes = getTagTypes(categoryId)
+if not tagTypes: forms.alert("No tag types loaded for {}.".format(chosenCategoryName), exitscript=True)
+chosenTagType = forms.SelectFromList.show(sorted(tagTypes.keys()), title="Select Tag Type", multiselect=False)
+if not chosenTagType: forms.alert("No tag type selected.", exitscript=True)
+tagTypeId = tagTypes[chosenTagType].Id
+
+# 2. Views to tag in
+views = selectTargetViews(doc, "Place tags in:")
+if not views: forms.alert("No views selected.", exitscript=True)
+
+# 3. Untagged elements grouped by view
+tagIndex = TagIndex(doc)
+work = []
+for view in views:
+    try: _, untaggedIds = getUntaggedInView(doc, view, categoryId, tagIndex)
+    except: continue
+    if untaggedIds: work.append((view, untaggedIds))
+
+total = sum(len(ids) for _, ids in work)
+if not total: forms.alert("All visible {} elements are already tagged.".format(chosenCategoryName), exitscript=True)
+if not forms.alert("Place {} tags in {} views?".format(total, len(work)), yes=True, no=True): forms.alert("Operation cancelled.", exitscript=True)
+
+# 4. Create tags per view in chunked transactions, rolled back as a whole if anything escapes
+created, done = 0, 0
+failures = []
+tg = DB.TransactionGroup(doc, "Tag Untagged Elements")
+tg.Start()
+t = None
+try:
+    with forms.ProgressBar(title="Placing tags ({value} of {max_value})", cancellable=True) as pb:
+        for view, untaggedIds in work:
+            if pb.cancelled: break
+            for start in range(0, len(untaggedIds), chunkSize):
+                if pb.cancelled: break
+                chunk = untaggedIds[start:start + chunkSize]
+                t = DB.Transaction(doc, "Tag Elements in {}".format(view.Name))
+                t.Start()
+                created += tagElements(view, chunk, tagTypeId, failures)
+                t.Commit()
+                done += len(chunk)
+                pb.update_progress(done, total)
+    tg.Assimilate()
+finally:
+    if t and t.HasStarted() and not t.HasEnded(): t.RollBack()
+    if not tg.HasEnded(): tg.RollBack()
+
+message = "Placed {} tags in {} views.".format(created, len(work))
+if done < total: message += "\nCancelled before {} elements were processed.".format(total - done)
+details = ""
+if failures:
+    message += "\n{} elements could not be tagged.".format(len(failures))
+    details = "\n".join("{}: {}".format(idValue(elementId), reason) for elementId, reason in failures[:20])
+    if len(failures) > 20: details += "\n..."
+forms.alert(message, sub_msg=details)
@@ -0,0 +1,45 @@
+from pyrevit import revit, DB, forms
+import csv
+from revitesse import idValue
+from revitesse.tags import TagIndex, getUntaggedInView, selectTargetViews
+
+doc = revit.doc
+
+# 1. Category to check
+modelCategories = [cat for cat in doc.Settings.Categories if cat.CategoryType == DB.CategoryType.Model]
+categoryNameToCategory = {cat.Name: cat for cat in modelCategories}
+chosenCategoryName = forms.SelectFromList.show(sorted(categoryNameToCategory.keys()), title="Select Category to Check", multiselect=False)
+if not chosenCategoryName: forms.alert("No category selected.", exitscript=True)
+categoryId = categoryNameToCategory[chosenCategoryName].Id
+
+# 2. Views to check
+views = selectTargetViews(doc, "Report untagged elements in:")
+if not views: forms.alert("No views selected.", exitscript=True)
+
+# 3. One pass over all tags, then one view-scoped collector per view
+tagIndex = TagIndex(doc)
+report = []
+with forms.ProgressBar(title="Checking views ({value} of {max_value})", cancellable=True) as pb:
+    for i, view in enumerate(views):
+        if pb.cancelled: break
+        try: visibleCount, untaggedIds = getUntaggedInView(doc, view, categoryId, tagIndex)
+        except: continue
+        report.append((view, visibleCount, untaggedIds))
+        pb.update_progress(i + 1, len(views))
+
+if not report: forms.alert("No views could be checked.", exitscript=True)
+
+untaggedTotal = sum(len(untaggedIds) for _, _, untaggedIds in report)
+viewsWithUntagged = len([r for r in report if r[2]])
+forms.alert("{} untagged {} elements in {} of {} views.".format(untaggedTotal, chosenCategoryName, viewsWithUntagged, len(report)))
+
+# 4. Export the per-view report
+csvPath = forms.save_file(file_ext='csv', title="Save CSV file")
+if csvPath:
+    with open(csvPath, 'w') as f:
+        writer = csv.writer(f)
+        writer.writerow(["View", "View Type", "View Id", "Visible Elements", "Tagged", "Untagged", "Untagged Element Ids"])
+        for view, visibleCount, untaggedIds in report:
+            writer.writerow([view.Name, str(view.ViewType), idValue(view.Id), visibleCount, visibleCount - len(untaggedIds), len(untaggedIds),
+                             ";".join(str(idValue(i)) for i in untaggedIds)])
+    forms.alert("Exported to: " + csvPath)
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -7,6 +10,7 @@ clr.AddReference('System.Windows.Forms')
 from Autodesk.Revit.DB import *
 from System.Windows.Forms import *
 from System import Array
+from revitesse.clouds import getCloudIndex
 
 doc = __revit__.ActiveUIDocument.Document
 
@@ -88,46 +92,22 @@ class ResetCloudMarksForm(Form):
 
     def onApply(self, s, e):
         from System.Windows.Forms import MessageBox, DialogResult
-        from Autodesk.Revit.DB import (FilteredElementCollector, RevisionCloud, BuiltInParameter, Transaction, View, ViewSheet, ElementId)
+        from Autodesk.Revit.DB import BuiltInParameter, Transaction
 
         # Scope from UI
         cloudsOnSheets = self.cmbPlacement.SelectedItem == "On Sheets"
-        # Selected revisions as a set of ElementId for fast membership checks
-        selectedRevisionIds = set(r.Id for r in self.selectedRevisions)
-        # Robust way to get a cloud's RevisionId across Revit versions
-        def getRevisionId(cloud):
-            try:
-                rid = cloud.RevisionId
-                if rid and rid.IntegerValue != -1: return rid
-            except: pass
-            p = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION)
-            return p.AsElementId() if p else ElementId.InvalidElementId
-
-        # Scope predicate
-        def inScope(view):
-            if cloudsOnSheets: return isinstance(view, ViewSheet)
-            else: return isinstance(view, View) and not isinstance(view, ViewSheet)
-
-        # Collect revision clouds by class and reset marks
-        clouds = list(FilteredElementCollector(self.doc).OfClass(RevisionCloud).WhereElementIsNotElementType())
+        # Clouds of the selected revisions from the shared index; the mark is read from the element itself
+        cloudIndex = getCloudIndex(self.doc)
+        records = cloudIndex.getClouds([r.Id for r in self.selectedRevisions], "On Sheets" if cloudsOnSheets else "On Views")
 
         t = Transaction(self.doc, "Reset Revision Cloud Marks")
         t.Start()
         changed = 0
-        for cloud in clouds:
-            revId = getRevisionId(cloud)
-            if revId not in selectedRevisionIds: continue
-
-            parentView = self.doc.GetElement(cloud.OwnerViewId)
-            if not inScope(parentView): continue
-
-            markParam = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_MARK)
-            if markParam and not markParam.IsReadOnly:
-                # Only write if there's actually something to clear
-                existing = markParam.AsString() or markParam.AsValueString()
-                if existing:
-                    markParam.Set("")
-                    changed += 1
+        for record in records:
+            markParam = cloudIndex.getCloud(record).get_Parameter(BuiltInParameter.ALL_MODEL_MARK)
+            if markParam and not markParam.IsReadOnly and markParam.AsString():
+                markParam.Set("")
+                changed += 1
         t.Commit()
 
         MessageBox.Show("Cleared Mark on {} revision cloud(s).".format(changed), "Reset complete")
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -12,6 +15,8 @@ from System.Drawing import *
 from System import Array
 from pyrevit import revit, DB
 from System.Collections.Generic import List
+from revitesse import idValue
+from revitesse.clouds import getCloudIndex
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
@@ -138,9 +143,8 @@ class CloudNumberingForm(Form):
             self.cmbParameter.SelectedIndex = 0
 
     def onApply(self, s, e):
-        from System.Text import StringBuilder
-        from System.Windows.Forms import MessageBox, DialogResult
-        from Autodesk.Revit.DB import (FilteredElementCollector, BuiltInCategory, RevisionCloud, BuiltInParameter, Transaction, View, ViewSheet)
+        from System.Windows.Forms import DialogResult
+        from Autodesk.Revit.DB import BuiltInParameter, Transaction
 
         # Parse user inputs
         fromChar = int(self.txtFrom.Text) - 1 if self.txtFrom.Text.strip() else None
@@ -150,27 +154,20 @@ class CloudNumberingForm(Form):
         paramName = self.cmbParameter.SelectedItem
         cloudsOnSheets = self.cmbPlacement.SelectedItem == "On Sheets"
 
-        # Collect all revision clouds
-        allClouds = FilteredElementCollector(self.doc).OfCategory(BuiltInCategory.OST_RevisionClouds).WhereElementIsNotElementType().ToElements()
-        # Selected revision IDs
-        selectedRevisionIds = [r.Id for r in self.selectedRevisions]
+        # Clouds of the selected revisions from the shared index, in selection order for the revision index
+        cloudIndex = getCloudIndex(self.doc)
+        revisionIndexes = dict((idValue(r.Id), i + 1) for i, r in enumerate(self.selectedRevisions))
+        records = cloudIndex.getClouds([r.Id for r in self.selectedRevisions], "On Sheets" if cloudsOnSheets else "On Views")
 
         # Group clouds by parent
         parentCloudDict = {}
-        for cloud in allClouds:
-            if not isinstance(cloud, RevisionCloud): continue
-            revId = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-            if revId not in selectedRevisionIds: continue
-
-            parent = self.doc.GetElement(cloud.OwnerViewId)
-            if cloudsOnSheets and isinstance(parent, ViewSheet): parentCloudDict.setdefault(parent.Id, []).append(cloud)
-            elif not cloudsOnSheets and isinstance(parent, View) and not isinstance(parent, ViewSheet): parentCloudDict.setdefault(parent.Id, []).append(cloud)
+        for record in records: parentCloudDict.setdefault(record.ownerViewId, []).append(record)
 
         # Start transaction
         t = Transaction(self.doc, "Number Revision Clouds")
         t.Start()
         for parentId, cloudList in parentCloudDict.items(): 
-            parent = self.doc.GetElement(parentId)
+            parent = cloudIndex.getView(cloudList[0])
             # Get parent parameter value
             paramValue = ""
             param = parent.LookupParameter(paramName)
@@ -180,19 +177,15 @@ class CloudNumberingForm(Form):
                     start = fromChar if fromChar is not None else 0
                     end = toChar if toChar is not None else len(paramValue)
                     paramValue = paramValue[start:end]
-            # Sort clouds for consistent numbering
-            cloudList.sort(key=lambda c: c.Id)
-            
-            for i, cloud in enumerate(cloudList, 1):
+            # Records come sorted by cloud id for consistent numbering
+            for i, record in enumerate(cloudList, 1):
                 numberParts = [paramValue, "{0:03d}".format(i)]
-                if addRevIndex:
-                    revId = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-                    revIndex = selectedRevisionIds.index(revId) + 1
-                    numberParts.append("{0:02d}".format(revIndex))
+                if addRevIndex: numberParts.append("{0:02d}".format(revisionIndexes[record.revisionId]))
                 fullNumber = separator.join(numberParts)
 
-                # Set built-in Mark parameter on cloud
-                markParam = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_MARK)
+                # Set built-in Mark parameter on cloud, skipping clouds that already carry the number
+                markParam = cloudIndex.getCloud(record).get_Parameter(BuiltInParameter.ALL_MODEL_MARK)
+                if markParam.AsString() == fullNumber: continue
                 markParam.Set(fullNumber)
         t.Commit()
 
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr
 clr.AddReference('System')
 clr.AddReference('System.Windows.Forms')
@@ -11,6 +14,8 @@ from System import Array
 from System.Windows.Forms import (Application, Form, CheckedListBox, DockStyle, Button, FlowLayoutPanel, FlowDirection, FormStartPosition, ComboBox, Label, Padding, DialogResult, Control)
 from Autodesk.Revit.DB import (FilteredElementCollector, BuiltInCategory, RevisionCloud, IndependentTag, ViewSheet, OverrideGraphicSettings, BuiltInParameter, Transaction, ElementId)
 from Autodesk.Revit.UI import TaskDialog
+from revitesse.clouds import getCloudIndex
+from revitesse.overrides import loadOverrideStore, saveOverrideStore, recordOverrides
 
 # Fall back to SystemExit when not available
 try: from pyrevit import script as pyScript
@@ -149,32 +154,12 @@ class CloudOverrideResetForm(Form):
         self.Close()
 
 # Override reset
-def elementRevisionIdForCloud(cloud):
-    # Try property first
-    try:
-        rid = getattr(cloud, "RevisionId", None)
-        if isinstance(rid, ElementId) and rid.IntegerValue != -1: return rid
-    except Exception: pass
-    # Fallback to parameter
-    try:
-        p = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION)
-        if p: return p.AsElementId()
-    except Exception: pass
-    return ElementId.InvalidElementId
-
 def resetOverrides(selectedRevisions, cloudFilter):
-    # Collect targets
-    clouds = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_RevisionClouds).WhereElementIsNotElementType().ToElements()
-    cloudTags = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_RevisionCloudTags).WhereElementIsNotElementType().ToElements()
-
-    selectedRevisionIds = set([r.Id for r in selectedRevisions])
-
-    def shouldOverride(view):
-        isSheet = isinstance(view, ViewSheet)
-        if cloudFilter == "All revision clouds": return True
-        elif cloudFilter == "Revision clouds placed on sheets" and isSheet: return True
-        elif cloudFilter == "Revision clouds placed on views" and not isSheet: return True
-        return False
+    # Targets from the shared cloud index
+    cloudIndex = getCloudIndex(doc)
+    records = cloudIndex.getClouds([r.Id for r in selectedRevisions], cloudFilter)
+    # Previous overrides, kept for Cloud Override Restore
+    store = loadOverrideStore(doc)
 
     t = Transaction(doc, "Reset Revision Cloud Overrides")
     t.Start()
@@ -183,39 +168,24 @@ def resetOverrides(selectedRevisions, cloudFilter):
     resetCountTags = 0
     ogsDefault = OverrideGraphicSettings()
 
-    # Clouds
-    for cloud in clouds:
+    # Clouds and their tags, in the owner view of the cloud
+    for record in records:
+        view = cloudIndex.getView(record)
+        if view is None: continue
         try:
-            if not isinstance(cloud, RevisionCloud): continue
-            revId = elementRevisionIdForCloud(cloud)
-            if revId not in selectedRevisionIds: continue
-            view = doc.GetElement(cloud.OwnerViewId)
-            if view is None or not shouldOverride(view): continue
-            view.SetElementOverrides(cloud.Id, ogsDefault)  # reset to default
+            recordOverrides(store, view, record.elementId, view.GetElementOverrides(record.elementId))
+            view.SetElementOverrides(record.elementId, ogsDefault)  # reset to default
             resetCountClouds += 1
         except Exception: pass
-
-    # Tags
-    for tag in cloudTags:
-        try:
-            if not isinstance(tag, IndependentTag): continue
-            # Get the first tagged local element (revision cloud)
-            try: tagged_ids = list(tag.GetTaggedLocalElementIds())
-            except Exception:
-                try: tagged_ids = list(tag.GetTaggedElementIds())
-                except Exception: tagged_ids = []
-            if not tagged_ids: continue
-            tagged_el = doc.GetElement(tagged_ids[0])
-            if not isinstance(tagged_el, RevisionCloud): continue
-            revId = elementRevisionIdForCloud(tagged_el)
-            if revId not in selectedRevisionIds: continue
-            view = doc.GetElement(tagged_el.OwnerViewId)
-            if view is None or not shouldOverride(view): continue
-            view.SetElementOverrides(tag.Id, ogsDefault)  # reset to default
-            resetCountTags += 1
-        except Exception: pass
+        for tagId in cloudIndex.getTagIds(record):
+            try:
+                recordOverrides(store, view, tagId, view.GetElementOverrides(tagId))
+                view.SetElementOverrides(tagId, ogsDefault)  # reset to default
+                resetCountTags += 1
+            except Exception: pass
 
     t.Commit()
+    saveOverrideStore(doc, store)
     return resetCountClouds, resetCountTags
 
 # Get all revisions in document
@@ -0,0 +1,17 @@
+from pyrevit import revit, forms, script
+from revitesse.overrides import loadOverrideStore, saveOverrideStore, restoreOverrideStore
+
+doc = revit.doc
+
+# 1. Overrides recorded by Cloud Override for this model
+store = loadOverrideStore(doc)
+if not store: forms.alert("No recorded cloud overrides found for this model.", exitscript=True)
+if not forms.alert("{} clouds and tags have recorded overrides. Restore them?".format(len(store)), yes=True, no=True): script.exit()
+
+# 2. Write back the previous overrides and forget the restored entries
+restored, unchanged, missing, failed = restoreOverrideStore(doc, store)
+saveOverrideStore(doc, store)
+summary = "{} restored, {} already matching.".format(restored, unchanged)
+if missing: summary += "\n{} no longer exist and were forgotten.".format(missing)
+if failed: summary += "\n{} could not be restored and are kept for the next run.".format(failed)
+forms.alert("Cloud overrides restored.", sub_msg=summary)
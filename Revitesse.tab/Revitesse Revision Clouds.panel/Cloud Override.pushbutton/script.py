@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr, os, csv
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -13,10 +16,16 @@ from pyrevit import DB
 from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory, BuiltInParameter, ElementId
 from Autodesk.Revit.UI import TaskDialog
 from System.Windows.Forms import SaveFileDialog, DialogResult
+from revitesse import idValue
+from revitesse.clouds import getCloudIndex, getRevisionFilters, getFilterHost, applyRevisionFilter
+from revitesse.overrides import loadOverrideStore, saveOverrideStore, recordOverrides
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
 
+# Per-element overrides on each cloud and tag, or one view filter per revision applied once per view or template
+applyModes = ["Element overrides on clouds and tags", "View filters per revision"]
+
 def getParameterString(elem, parameterName):
     p = elem.LookupParameter(parameterName)
     return p.AsString() if p else ""
@@ -90,7 +99,7 @@ class OverrideGraphicsForm(Form):
         self.selectedRevisions = selectedRevisions
         self.Text = "Cloud Override Graphics"
         self.Width = 460
-        self.Height = 360
+        self.Height = 395
         self.StartPosition = FormStartPosition.CenterScreen
 
         self.chkHalftone = CheckBox(Text="Halftone", Left=310, Top=10)
@@ -100,6 +109,9 @@ class OverrideGraphicsForm(Form):
         self.cmbCloudOverride = ComboBox(Left=190, Top=215, Width=240, DropDownStyle=ComboBoxStyle.DropDownList)
         self.cmbCloudOverride.Items.AddRange(Array[object](["All revision clouds", "Revision clouds placed on sheets", "Revision clouds placed on views"]))
         self.cmbCloudOverride.SelectedIndex = 0
+        self.cmbApplyMode = ComboBox(Left=190, Top=250, Width=240, DropDownStyle=ComboBoxStyle.DropDownList)
+        self.cmbApplyMode.Items.AddRange(Array[object](applyModes))
+        self.cmbApplyMode.SelectedIndex = 0
 
         self.buttonColor = Button(Text="<By Object Style>", Left=210, Top=145, Width=220)
         self.buttonColor.TextAlign = ContentAlignment.MiddleLeft
@@ -113,7 +125,8 @@ class OverrideGraphicsForm(Form):
             "linepattern": (10, 110, "Pattern:", ContentAlignment.MiddleRight, False, 170),
             "color": (10, 145, "Color:", ContentAlignment.MiddleRight, False, 170),
             "lineweight": (10, 180, "Weight:", ContentAlignment.MiddleRight, False, 170),
-            "cloudoverride": (10, 215, "Revision clouds to override:", ContentAlignment.MiddleRight, False, 170)
+            "cloudoverride": (10, 215, "Revision clouds to override:", ContentAlignment.MiddleRight, False, 170),
+            "applymode": (10, 250, "Apply as:", ContentAlignment.MiddleRight, False, 170)
         }
         
         for _, (x, y, text, align, bold, w) in labels.items():
@@ -135,7 +148,7 @@ class OverrideGraphicsForm(Form):
         self.buttonApply.Click += self.onApply
 
         panelButtons.Controls.AddRange(Array[Control]([self.buttonApply, self.buttonCancel, self.buttonOK, self.buttonApplyExport]))
-        self.Controls.AddRange(Array[Control]([ self.txtDefiningText, self.chkHalftone, self.cmbLinePattern, self.cmbLineweight, self.cmbCloudOverride, self.buttonColor, self.colorBox, panelButtons ]))
+        self.Controls.AddRange(Array[Control]([ self.txtDefiningText, self.chkHalftone, self.cmbLinePattern, self.cmbLineweight, self.cmbCloudOverride, self.cmbApplyMode, self.buttonColor, self.colorBox, panelButtons ]))
 
         self.selectedColor = None
         self.populateLinePatterns()
@@ -143,7 +156,7 @@ class OverrideGraphicsForm(Form):
 
     def populateLinePatterns(self):
         self.cmbLinePattern.Items.Add("<By Object Style>")
-        patterns = [lp.Name for lp in FilteredElementCollector(self.doc).OfClass(LinePatternElement)]
+        patterns = [name for name, patternId in getCloudIndex(self.doc).getLinePatterns()]
         self.cmbLinePattern.Items.AddRange(Array[object](patterns))
         self.cmbLinePattern.SelectedIndex = 0
 
@@ -175,74 +188,84 @@ class OverrideGraphicsForm(Form):
         lineweightText = self.cmbLineweight.SelectedItem
         cloudFilter = self.cmbCloudOverride.SelectedItem
 
+        cloudIndex = getCloudIndex(self.doc)
         linePatternId = None
-        if linePatternName != "<By Object Style>":
-            linePatternId = next((lp.Id for lp in FilteredElementCollector(self.doc).OfClass(LinePatternElement) if lp.Name == linePatternName), None)
+        if linePatternName != "<By Object Style>": linePatternId = cloudIndex.getLinePatternId(linePatternName)
 
         lineweight = 0 if lineweightText == "<By Object Style>" else int(lineweightText)
 
         color = None
         if self.selectedColor: color = Autodesk.Revit.DB.Color(self.selectedColor.R, self.selectedColor.G, self.selectedColor.B)
 
-        clouds = FilteredElementCollector(self.doc).OfCategory(BuiltInCategory.OST_RevisionClouds).WhereElementIsNotElementType().ToElements()
-        cloudTags = FilteredElementCollector(self.doc).OfCategory(BuiltInCategory.OST_RevisionCloudTags).WhereElementIsNotElementType().ToElements()
-
-        selectedRevisionIds = [r.Id for r in self.selectedRevisions]
+        def setOverrides(ogs):
+            if color: ogs.SetProjectionLineColor(color)
+            ogs.SetHalftone(halftone)
+            if lineweight: ogs.SetProjectionLineWeight(lineweight)
+            if linePatternId: ogs.SetProjectionLinePatternId(linePatternId)
+            return ogs
+
+        # True when an override already shows every setting of the form
+        def hasOverrides(ogs):
+            if color:
+                current = ogs.ProjectionLineColor
+                if not current.IsValid or (current.Red, current.Green, current.Blue) != (color.Red, color.Green, color.Blue): return False
+            if ogs.Halftone != halftone: return False
+            if lineweight and ogs.ProjectionLineWeight != lineweight: return False
+            if linePatternId and idValue(ogs.ProjectionLinePatternId) != idValue(linePatternId): return False
+            return True
+
+        records = cloudIndex.getClouds([r.Id for r in self.selectedRevisions], cloudFilter, definingText)
+
+        # Previous overrides, kept for Cloud Override Restore
+        store = loadOverrideStore(self.doc)
+        recorded = False
 
         t = Transaction(self.doc, "Override Revision Clouds and Tags")
         t.Start()
-
-        def shouldOverride(view, isSheet):
-            if cloudFilter == "All revision clouds": return True
-            elif cloudFilter == "Revision clouds placed on sheets" and isSheet: return True
-            elif cloudFilter == "Revision clouds placed on views" and not isSheet: return True
-            return False
-
-        for cloud in clouds:
-            if isinstance(cloud, RevisionCloud):
-                revId = getattr(cloud, "RevisionId", None) or cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-                if revId not in selectedRevisionIds: continue
-
-                commentParameter = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS)
-                comments = commentParameter.AsString() or ""
-                if definingText and definingText.lower() not in comments.lower(): continue
-
-                view = self.doc.GetElement(cloud.OwnerViewId)
-                isSheet = isinstance(view, ViewSheet)
-                if not shouldOverride(view, isSheet): continue
-
-                ogs = OverrideGraphicSettings(view.GetElementOverrides(cloud.Id))
-                if color: ogs.SetProjectionLineColor(color)
-                ogs.SetHalftone(halftone)
-                if lineweight: ogs.SetProjectionLineWeight(lineweight)
-                if linePatternId: ogs.SetProjectionLinePatternId(linePatternId)
-                view.SetElementOverrides(cloud.Id, ogs)
-
-        for tag in cloudTags:
-            if isinstance(tag, IndependentTag):
-                taggedIds = list(tag.GetTaggedLocalElementIds())
-                if not taggedIds: continue
-                taggedElement = self.doc.GetElement(taggedIds[0])
-                if not isinstance(taggedElement, RevisionCloud): continue
-
-                revId = getattr(taggedElement, "RevisionId", None) or taggedElement.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-                if revId not in selectedRevisionIds: continue
-
-                commentParameter = taggedElement.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS)
-                comments = commentParameter.AsString() or ""
-                if definingText and definingText.lower() not in comments.lower(): continue
-
-                view = self.doc.GetElement(taggedElement.OwnerViewId)
-                isSheet = isinstance(view, ViewSheet)
-                if not shouldOverride(view, isSheet): continue
-
-                ogs = OverrideGraphicSettings(view.GetElementOverrides(tag.Id))
-                if color: ogs.SetProjectionLineColor(color)
-                ogs.SetHalftone(halftone)
-                if lineweight: ogs.SetProjectionLineWeight(lineweight)
-                if linePatternId: ogs.SetProjectionLinePatternId(linePatternId)
-                view.SetElementOverrides(tag.Id, ogs)
+        if self.cmbApplyMode.SelectedItem == applyModes[1]: records = self.applyFilters(cloudIndex, records, definingText, setOverrides(OverrideGraphicSettings()))
+        # Clouds and their tags grouped by owner view, written only where the override differs
+        recordsByView = {}
+        for record in records: recordsByView.setdefault(record.ownerViewId, []).append(record)
+        for viewRecords in recordsByView.values():
+            view = cloudIndex.getView(viewRecords[0])
+            if view is None: continue
+            for record in viewRecords:
+                for elementId in [record.elementId] + cloudIndex.getTagIds(record):
+                    current = view.GetElementOverrides(elementId)
+                    if hasOverrides(current): continue
+                    if recordOverrides(store, view, elementId, current): recorded = True
+                    view.SetElementOverrides(elementId, setOverrides(OverrideGraphicSettings(current)))
         t.Commit()
+        if recorded: saveOverrideStore(self.doc, store)
+
+    # Style the clouds through revision filters on their owner views or templates; returns the records of views that take no filters
+    def applyFilters(self, cloudIndex, records, definingText, ogs):
+        recordsByView = {}
+        for record in records:
+            if cloudIndex.getView(record) is None: continue
+            recordsByView.setdefault(record.ownerViewId, []).append(record)
+        if not recordsByView: return []
+
+        revisionIds = set(record.revisionId for record in records)
+        filters = getRevisionFilters(self.doc, [r for r in self.selectedRevisions if idValue(r.Id) in revisionIds], definingText)
+        hostRevisions = {}
+        hosts = {}
+        unfiltered = []
+        for viewRecords in recordsByView.values():
+            view = cloudIndex.getView(viewRecords[0])
+            # Sheets and other views without filters keep per-element overrides
+            if not view.AreGraphicsOverridesAllowed() or isinstance(view, ViewSheet):
+                unfiltered.extend(viewRecords)
+                continue
+            host = getFilterHost(self.doc, view)
+            hostKey = idValue(host.Id)
+            hosts[hostKey] = host
+            hostRevisions.setdefault(hostKey, set()).update(record.revisionId for record in viewRecords)
+
+        # Each filter is set once per view or template, however many clouds it styles
+        for hostKey, hostRevisionIds in hostRevisions.items():
+            for revisionId in hostRevisionIds: applyRevisionFilter(hosts[hostKey], filters[revisionId], ogs)
+        return unfiltered
 
     def exportCsv(self):
         # Apply overrides first
@@ -250,36 +273,9 @@ class OverrideGraphicsForm(Form):
         definingText = self.txtDefiningText.Text.strip()
         cloudFilter = self.cmbCloudOverride.SelectedItem
 
-        # Filtering clouds/views
-        def shouldOverride(view, isSheet):
-            if cloudFilter == "All revision clouds": return True
-            elif cloudFilter == "Revision clouds placed on sheets" and isSheet: return True
-            elif cloudFilter == "Revision clouds placed on views" and not isSheet: return True
-            return False
-
-        # Collect revision clouds
-        clouds = FilteredElementCollector(self.doc).OfCategory(BuiltInCategory.OST_RevisionClouds).WhereElementIsNotElementType().ToElements()
-        # Get selected revision IDs
-        selectedRevisionIds = [r.Id for r in self.selectedRevisions]
-
-        # Filter clouds
-        filteredClouds = []
-        for cloud in clouds:
-            if not isinstance(cloud, RevisionCloud): continue
-
-            revisionParameter = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION)
-            revisionId = getattr(cloud, "RevisionId", None) or revisionParameter.AsElementId()
-            if revisionId not in selectedRevisionIds: continue
-
-            commentParameter = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS)
-            comments = commentParameter.AsString() or ""
-            if definingText and definingText.lower() not in comments.lower(): continue
-
-            view = self.doc.GetElement(cloud.OwnerViewId)
-            isSheet = isinstance(view, ViewSheet)
-            if not shouldOverride(view, isSheet): continue
-
-            filteredClouds.append(cloud)
+        # Clouds from the shared index
+        cloudIndex = getCloudIndex(self.doc)
+        filteredClouds = cloudIndex.getClouds([r.Id for r in self.selectedRevisions], cloudFilter, definingText)
 
         if not filteredClouds:
             MessageBox.Show("No revision clouds found for export.", "Info")
@@ -287,7 +283,7 @@ class OverrideGraphicsForm(Form):
 
         # Prepare CSV header: Parent Name, Revision Description, Mark, Comment, ElementId, plus parameters
         header = ['Parent Name', 'Revision Description', 'Mark', 'Comment', 'ElementId']
-        if filteredClouds: header += [p.Definition.Name for p in filteredClouds[0].Parameters]
+        if filteredClouds: header += [p.Definition.Name for p in cloudIndex.getCloud(filteredClouds[0]).Parameters]
 
         # Ask user for file path
         saveDialog = SaveFileDialog()
@@ -297,17 +293,16 @@ class OverrideGraphicsForm(Form):
 
         # Collect row data
         rows = []
-        for cloud in filteredClouds:
+        for record in filteredClouds:
+            cloud = cloudIndex.getCloud(record)
             # Revision description
-            revisionId = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-            revision = self.doc.GetElement(revisionId) if revisionId != -1 else None
-            revisionDescription = revision.Description if revision else ""
+            revisionDescription = cloudIndex.getRevisionDescription(record)
             # Parent view/sheet name
-            parent = self.doc.GetElement(cloud.OwnerViewId)
+            parent = cloudIndex.getView(record)
             parentName = parent.Name if parent else ""
             # Mark and Comment
-            markParameter = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_MARK).AsString()
-            commentParameter = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS).AsString()
+            markParameter = record.mark
+            commentParameter = record.comment
             cloudId = cloud.Id
             # All parameter values
             parameterValues = []
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr, os, csv
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -13,6 +16,7 @@ from System.Drawing import *
 from System import Array
 from pyrevit import revit, DB
 from System.Collections.Generic import List
+from revitesse.clouds import getCloudIndex
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
@@ -118,44 +122,21 @@ class CloudSelectionForm(Form):
         panelButtons.Controls.AddRange(Array[Control]([self.buttonSelect, self.buttonCancel, self.buttonExport]))
         self.Controls.AddRange(Array[Control]([lblDefining, self.txtDefiningText, lblCloudFilter, self.cmbCloudOverride, panelButtons]))
 
+    # Records of the matching clouds from the shared index
     def filterClouds(self):
-        definingText = self.txtDefiningText.Text.strip()
-        cloudFilter = self.cmbCloudOverride.SelectedItem
-
-        def shouldInclude(view, isSheet):
-            if cloudFilter == "All revision clouds": return True
-            elif cloudFilter == "Revision clouds placed on sheets" and isSheet: return True
-            elif cloudFilter == "Revision clouds placed on views" and not isSheet: return True
-            return False
-
-        clouds = FilteredElementCollector(self.doc).OfCategory(BuiltInCategory.OST_RevisionClouds).WhereElementIsNotElementType().ToElements()
-
-        selectedRevisionIds = [r.Id for r in self.selectedRevisions]
-        filteredClouds = []
-
-        for cloud in clouds:
-            if not isinstance(cloud, RevisionCloud): continue
-            revId = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-            if revId not in selectedRevisionIds: continue
-            comments = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS).AsString() or ""
-            if definingText and definingText.lower() not in comments.lower(): continue
-            view = self.doc.GetElement(cloud.OwnerViewId)
-            isSheet = isinstance(view, ViewSheet)
-            if not shouldInclude(view, isSheet): continue
-            filteredClouds.append(cloud)
-
-        return filteredClouds
+        self.cloudIndex = getCloudIndex(self.doc)
+        return self.cloudIndex.getClouds([r.Id for r in self.selectedRevisions], self.cmbCloudOverride.SelectedItem, self.txtDefiningText.Text.strip())
 
     def onSelect(self, s, e):
         filteredClouds = self.filterClouds()
-        elementIds = List[ElementId]([c.Id for c in filteredClouds])
+        elementIds = List[ElementId]([r.elementId for r in filteredClouds])
         revit.uidoc.ShowElements(elementIds)
         revit.uidoc.Selection.SetElementIds(elementIds)
         self.Close()
         
     def onExport(self, s, e):
         filteredClouds = self.filterClouds()
-        elementIds = List[ElementId]([c.Id for c in filteredClouds])
+        elementIds = List[ElementId]([r.elementId for r in filteredClouds])
         revit.uidoc.ShowElements(elementIds)
         revit.uidoc.Selection.SetElementIds(elementIds)
 
@@ -170,24 +151,23 @@ class CloudSelectionForm(Form):
 
         # Header
         header = ['Parent Name', 'Revision Description', 'Mark', 'Comment', 'ElementId']
-        if filteredClouds: header += [p.Definition.Name for p in filteredClouds[0].Parameters]
+        if filteredClouds: header += [p.Definition.Name for p in self.cloudIndex.getCloud(filteredClouds[0]).Parameters]
 
         with open(filepath, 'w') as csvfile:
             writer = csv.writer(csvfile, delimiter='\t')
             writer.writerow(header)
             rows = []
 
-            for cloud in filteredClouds:
+            for record in filteredClouds:
+                cloud = self.cloudIndex.getCloud(record)
                 # Revision info
-                revisionId = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-                revision = doc.GetElement(revisionId) if revisionId != -1 else None
-                revisionDescription = revision.Description if revision else ""
+                revisionDescription = self.cloudIndex.getRevisionDescription(record)
 
-                parent = doc.GetElement(cloud.OwnerViewId)
+                parent = self.cloudIndex.getView(record)
                 parentName = parent.Name if parent else ""
                 # Mark and comment
-                markParameter = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_MARK).AsString()
-                commentParameter = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS).AsString()
+                markParameter = record.mark
+                commentParameter = record.comment
                 cloudId = cloud.Id
                 # Parameter values
                 parameterValues = []
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+# The index cache handlers live in this engine, so it has to outlive the command
+__persistentengine__ = True
+
 import clr, os
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -11,6 +14,7 @@ from System.Drawing import *
 from System import Array
 from pyrevit import revit, DB
 from System.Collections.Generic import List
+from revitesse.clouds import getCloudIndex
 
 doc = __revit__.ActiveUIDocument.Document
 uidoc = __revit__.ActiveUIDocument
@@ -123,26 +127,10 @@ class CloudExportForm(Form):
         self.DialogResult = DialogResult.OK
         self.Close()
 
+    # Records of the matching clouds from the shared index
     def filterClouds(self):
-        cloudFilter = self.result
-        def shouldInclude(view, isSheet):
-            if cloudFilter == "All revision clouds": return True
-            elif cloudFilter == "Revision clouds placed on sheets" and isSheet: return True
-            elif cloudFilter == "Revision clouds placed on views" and not isSheet: return True
-            return False
-
-        clouds = FilteredElementCollector(self.doc).OfCategory(BuiltInCategory.OST_RevisionClouds).WhereElementIsNotElementType().ToElements()
-        selectedRevisionIds = [r.Id for r in self.selectedRevisions]
-        filtered = []
-        for cloud in clouds:
-            if not isinstance(cloud, RevisionCloud): continue
-            revId = cloud.get_Parameter(BuiltInParameter.REVISION_CLOUD_REVISION).AsElementId()
-            if revId not in selectedRevisionIds: continue
-            view = self.doc.GetElement(cloud.OwnerViewId)
-            isSheet = isinstance(view, ViewSheet)
-            if not shouldInclude(view, isSheet): continue
-            filtered.append(cloud)
-        return filtered
+        self.cloudIndex = getCloudIndex(self.doc)
+        return self.cloudIndex.getClouds([r.Id for r in self.selectedRevisions], self.result)
 
 # Step 3: Ensure parameter exists
 def ensureRevitesseParameter():
@@ -206,11 +194,10 @@ ensureRevitesseParameter()
 
 # 4. Group clouds by parent element and build string
 viewCloudMap = {}
-for cloud in filteredClouds:
-    parent = doc.GetElement(cloud.OwnerViewId)
+for record in filteredClouds:
+    parent = cloudForm.cloudIndex.getView(record)
     if not parent: continue
-    mark = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_MARK).AsString() or ""
-    comment = cloud.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS).AsString() or ""
+    mark, comment = record.mark, record.comment
     if mark: entry = "{}{}{}".format(mark, cloudForm.separator, comment).strip()
     else: entry = comment.strip()
     if parent.Id not in viewCloudMap: viewCloudMap[parent.Id] = []
@@ -0,0 +1,9 @@
+# Shared helpers for the Revitesse tools
+
+# Integer value of an element id (ElementId.Value replaces IntegerValue in Revit 2024+)
+def idValue(elementId):
+    return elementId.Value if hasattr(elementId, "Value") else elementId.IntegerValue
+
+# Key of a document in the session caches and per-document stores
+def documentKey(doc):
+    return doc.PathName or doc.Title
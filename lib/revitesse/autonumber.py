@@ -0,0 +1,118 @@
+from System import Guid
+from System.Collections.Generic import List
+from pyrevit import DB, HOST_APP, script
+from revitesse import idValue
+from revitesse.numbering import (numberingCategories, existingModes, activePhaseMode, loadNumberingSettings, getSeparator, getResolver, GridResolver,
+                                 getElementPhaseFunction, groupElementsByRoom, collectElements, getMark, parseMarkIndex, planRoomMarks)
+
+logger = script.get_logger()
+
+# Categories numbered live with their saved settings
+autoNumberingCategories = ["Doors", "Windows"]
+updaterGuid = Guid("6f1f4c7e-2b0d-4a8e-9c51-3d7a9e2b8c14")
+# Reach of the neighbour search: margin around a room, and the extent of grid cells open towards the outermost grid
+neighbourTolerance = 1.0
+openCellExtent = 1.0e6
+
+# Elements of the category near a group, through the spatial index: inside the room's box or the grid cell; None when the group has no area
+def getGroupNeighbours(doc, config, room, point, resolver):
+    if room:
+        box = room.get_BoundingBox(None)
+        if not box: return None
+        outline = DB.Outline(box.Min, box.Max)
+    elif isinstance(resolver, GridResolver) and point:
+        cellBounds = resolver.gridIndex.getCellBounds(point)
+        (minX, maxX), (minY, maxY) = cellBounds["X"], cellBounds["Y"]
+        outline = DB.Outline(DB.XYZ(minX if minX is not None else -openCellExtent, minY if minY is not None else -openCellExtent, -openCellExtent),
+                             DB.XYZ(maxX if maxX is not None else openCellExtent, maxY if maxY is not None else openCellExtent, openCellExtent))
+    else: return None
+    boxFilter = DB.BoundingBoxIntersectsFilter(outline, neighbourTolerance)
+    return list(DB.FilteredElementCollector(doc).OfCategory(config["category"]).WhereElementIsNotElementType().WherePasses(boxFilter))
+
+# Give added or moved elements the next free mark in their room, leaving the room's other marks alone
+def autoNumberElements(doc, config, settings, elements):
+    separator = getSeparator(settings)
+    keepSettings = dict(settings)
+    if keepSettings.get("existingMode") not in existingModes[1:]: keepSettings["existingMode"] = existingModes[1]
+    resolver = getResolver(doc, settings)
+    groups, withoutRooms = groupElementsByRoom(elements, getElementPhaseFunction(doc, settings.get("phaseMode", activePhaseMode)), resolver)
+    if not groups: return
+
+    markParameterId = config["markParameter"]
+    affectedIds = set(idValue(elem.Id) for elem in elements)
+    categoryElements = None
+    for roomNumber, roomElements in groups.items():
+        # Elements already numbered under this room number, found by their marks among the elements near its room in every phase
+        neighbours = []
+        for (phase, room), placeElements in resolver.splitByPlace(roomElements):
+            placeNeighbours = getGroupNeighbours(doc, config, room, resolver.getPoint(placeElements[0]), resolver)
+            if placeNeighbours is None:
+                if categoryElements is None: categoryElements = collectElements(doc, config)
+                placeNeighbours = categoryElements
+            neighbours.extend(placeNeighbours)
+        currentMarks = dict((idValue(elem.Id), getMark(elem, markParameterId)) for elem in roomElements)
+        peers = []
+        for elem in neighbours:
+            elemId = idValue(elem.Id)
+            if elemId in affectedIds or elemId in currentMarks: continue
+            mark = getMark(elem, markParameterId)
+            if mark and parseMarkIndex(mark, roomNumber, keepSettings, separator) is not None:
+                currentMarks[elemId] = mark
+                peers.append(elem)
+
+        # Peers come first so a copied mark loses its position to the original
+        roomElements.sort(key=lambda e: idValue(e.Id))
+        newMarks = planRoomMarks(roomNumber, peers + roomElements, keepSettings, separator, currentMarks)
+        for elem in roomElements:
+            mark = newMarks[idValue(elem.Id)]
+            if mark == currentMarks.get(idValue(elem.Id)): continue
+            markParameter = elem.get_Parameter(markParameterId)
+            if markParameter and not markParameter.IsReadOnly: markParameter.Set(mark)
+
+class AutoNumberUpdater(DB.IUpdater):
+    def __init__(self, addInId):
+        self.updaterId = DB.UpdaterId(addInId, updaterGuid)
+
+    def GetUpdaterId(self):
+        return self.updaterId
+
+    def GetUpdaterName(self):
+        return "Revitesse Auto Numbering"
+
+    def GetAdditionalInformation(self):
+        return "Numbers newly placed or moved doors and windows with the saved Revitesse numbering settings."
+
+    def GetChangePriority(self):
+        return DB.ChangePriority.DoorsOpeningsWindows
+
+    # Runs inside the user's own transaction
+    def Execute(self, data):
+        doc = data.GetDocument()
+        changedIds = list(data.GetAddedElementIds()) + list(data.GetModifiedElementIds())
+        changed = [doc.GetElement(elementId) for elementId in changedIds]
+        changed = [elem for elem in changed if isinstance(elem, DB.FamilyInstance) and elem.Category]
+        for categoryName in autoNumberingCategories:
+            config = numberingCategories[categoryName]
+            elements = [elem for elem in changed if idValue(elem.Category.Id) == int(config["category"])]
+            settings = loadNumberingSettings(categoryName) if elements else None
+            if not settings: continue
+            try: autoNumberElements(doc, config, settings, elements)
+            except Exception as e: logger.error("Auto numbering of {} failed: {}".format(config["plural"], e))
+
+def getUpdaterId():
+    return DB.UpdaterId(HOST_APP.uiapp.ActiveAddInId, updaterGuid)
+
+def isAutoNumberingEnabled():
+    return DB.UpdaterRegistry.IsUpdaterRegistered(getUpdaterId())
+
+# Register the updater for this session, triggered by placing or moving elements of the auto numbered categories
+def enableAutoNumbering():
+    updater = AutoNumberUpdater(HOST_APP.uiapp.ActiveAddInId)
+    DB.UpdaterRegistry.RegisterUpdater(updater, True)
+    filters = [DB.ElementCategoryFilter(numberingCategories[name]["category"]) for name in autoNumberingCategories]
+    categoryFilter = DB.LogicalOrFilter(List[DB.ElementFilter](filters))
+    DB.UpdaterRegistry.AddTrigger(updater.GetUpdaterId(), categoryFilter, DB.Element.GetChangeTypeElementAddition())
+    DB.UpdaterRegistry.AddTrigger(updater.GetUpdaterId(), categoryFilter, DB.Element.GetChangeTypeGeometry())
+
+def disableAutoNumbering():
+    DB.UpdaterRegistry.UnregisterUpdater(getUpdaterId())
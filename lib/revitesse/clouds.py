@@ -0,0 +1,204 @@
+import re
+from System.Collections.Generic import List
+from pyrevit import DB, HOST_APP
+from pyrevit.coreutils import envvars
+from revitesse import idValue, documentKey
+from revitesse.overrides import encodeOverrides
+
+indexCacheName = "REVITESSE_CLOUDINDEX"
+handlerFlagName = "REVITESSE_CLOUDINDEX_HANDLER"
+
+# Placement choices offered by the Revision Clouds tools: True for sheets, False for views, None for both
+cloudScopes = {"All revision clouds": None, "Revision clouds placed on sheets": True, "Revision clouds placed on views": False,
+               "On Sheets": True, "On Views": False}
+
+# Revision of a cloud across Revit versions
+def getCloudRevisionId(cloud):
+    try:
+        revisionId = cloud.RevisionId
+        if revisionId and idValue(revisionId) != -1: return revisionId
+    except: pass
+    parameter = cloud.get_Parameter(DB.BuiltInParameter.REVISION_CLOUD_REVISION)
+    return parameter.AsElementId() if parameter else DB.ElementId.InvalidElementId
+
+def getStringValue(elem, parameterId):
+    parameter = elem.get_Parameter(parameterId)
+    return parameter.AsString() or "" if parameter else ""
+
+class CloudRecord(object):
+    __slots__ = ("elementId", "id", "revisionId", "ownerViewId", "onSheet", "mark", "comment")
+
+    def __init__(self, cloud, ownerView):
+        self.elementId = cloud.Id
+        self.id = idValue(cloud.Id)
+        self.revisionId = idValue(getCloudRevisionId(cloud))
+        self.ownerViewId = idValue(cloud.OwnerViewId)
+        # None when the owner view cannot be resolved
+        self.onSheet = isinstance(ownerView, DB.ViewSheet) if isinstance(ownerView, DB.View) else None
+        self.mark = getStringValue(cloud, DB.BuiltInParameter.ALL_MODEL_MARK)
+        self.comment = getStringValue(cloud, DB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS)
+
+# Every revision cloud of a document as compact records, with owner views resolved once
+class CloudIndex(object):
+    def __init__(self, doc):
+        self.doc = doc
+        self.records = {}
+        self.views = {}
+        self.revisions = {}
+        # Cloud id -> ids of the tags on it, built on first use
+        self.tagsByCloud = None
+        # Line patterns of the document as (name, id), for the override tools
+        self.linePatterns = None
+        self.pending = set()
+        for cloud in DB.FilteredElementCollector(doc).OfClass(DB.RevisionCloud): self.addCloud(cloud)
+
+    def addCloud(self, cloud):
+        ownerViewId = idValue(cloud.OwnerViewId)
+        if ownerViewId not in self.views: self.views[ownerViewId] = self.doc.GetElement(cloud.OwnerViewId)
+        record = CloudRecord(cloud, self.views[ownerViewId])
+        self.records[record.id] = record
+
+    # Apply the changes recorded by the DocumentChanged handler since the last use
+    def refresh(self):
+        if not self.pending: return
+        pending, self.pending = self.pending, set()
+        for cloudId in pending:
+            self.records.pop(cloudId, None)
+            cloud = self.doc.GetElement(DB.ElementId(cloudId))
+            if isinstance(cloud, DB.RevisionCloud): self.addCloud(cloud)
+
+    # Records of the revisions, placement and comment text, sorted by cloud id
+    def getClouds(self, revisionIds=None, scope=None, definingText=None):
+        revisionKeys = set(idValue(i) for i in revisionIds) if revisionIds is not None else None
+        onSheet = cloudScopes.get(scope)
+        needle = definingText.lower() if definingText else None
+        clouds = []
+        for record in self.records.values():
+            if revisionKeys is not None and record.revisionId not in revisionKeys: continue
+            if onSheet is not None and record.onSheet != onSheet: continue
+            if needle and needle not in record.comment.lower(): continue
+            clouds.append(record)
+        clouds.sort(key=lambda r: r.id)
+        return clouds
+
+    def getView(self, record):
+        return self.views.get(record.ownerViewId)
+
+    def getCloud(self, record):
+        return self.doc.GetElement(record.elementId)
+
+    def getRevisionDescription(self, record):
+        if record.revisionId not in self.revisions:
+            revision = self.doc.GetElement(DB.ElementId(record.revisionId)) if record.revisionId != -1 else None
+            self.revisions[record.revisionId] = revision.Description if revision else ""
+        return self.revisions[record.revisionId]
+
+    # Ids of the tags on a cloud, from one pass over all revision cloud tags
+    def getTagIds(self, record):
+        if self.tagsByCloud is None:
+            self.tagsByCloud = {}
+            tags = DB.FilteredElementCollector(self.doc).OfCategory(DB.BuiltInCategory.OST_RevisionCloudTags).WhereElementIsNotElementType()
+            for tag in tags:
+                if not isinstance(tag, DB.IndependentTag): continue
+                try: taggedIds = list(tag.GetTaggedLocalElementIds())
+                except: continue
+                if not taggedIds: continue
+                cloudId = idValue(taggedIds[0])
+                if cloudId not in self.tagsByCloud: self.tagsByCloud[cloudId] = []
+                self.tagsByCloud[cloudId].append(tag.Id)
+        return self.tagsByCloud.get(record.id, [])
+
+    def getLinePatterns(self):
+        if self.linePatterns is None: self.linePatterns = [(p.Name, p.Id) for p in DB.FilteredElementCollector(self.doc).OfClass(DB.LinePatternElement)]
+        return self.linePatterns
+
+    def getLinePatternId(self, name):
+        return next((patternId for patternName, patternId in self.getLinePatterns() if patternName == name), None)
+
+# View filters styling the clouds of one revision, optionally narrowed by text in their comments
+revisionFilterPrefix = "Revitesse Clouds - Revision "
+
+# Keyed on the revision id, which unlike the sequence number does not change when revisions are reordered
+def getRevisionFilterName(revision, definingText=None):
+    name = revisionFilterPrefix + str(idValue(revision.Id))
+    if definingText: name += " ({})".format(re.sub(r"[\\:{}\[\]|;<>?`~]", "", definingText))
+    return name
+
+def createContainsRule(parameterId, text):
+    try: return DB.ParameterFilterRuleFactory.CreateContainsRule(parameterId, text)
+    except TypeError: return DB.ParameterFilterRuleFactory.CreateContainsRule(parameterId, text, False)
+
+# One filter per revision on the cloud revision parameter, created or updated in place: revision id -> filter id
+def getRevisionFilters(doc, revisions, definingText=None):
+    existing = dict((f.Name, f) for f in DB.FilteredElementCollector(doc).OfClass(DB.ParameterFilterElement))
+    categories = List[DB.ElementId]([DB.ElementId(DB.BuiltInCategory.OST_RevisionClouds)])
+    filters = {}
+    for revision in revisions:
+        rules = [DB.ParameterFilterRuleFactory.CreateEqualsRule(DB.ElementId(DB.BuiltInParameter.REVISION_CLOUD_REVISION), revision.Id)]
+        if definingText: rules.append(createContainsRule(DB.ElementId(DB.BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS), definingText))
+        elementFilter = DB.ElementParameterFilter(List[DB.FilterRule](rules))
+        name = getRevisionFilterName(revision, definingText)
+        filterElement = existing.get(name)
+        if filterElement: filterElement.SetElementFilter(elementFilter)
+        else: filterElement = DB.ParameterFilterElement.Create(doc, name, categories, elementFilter)
+        filters[idValue(revision.Id)] = filterElement.Id
+    return filters
+
+# The view whose filters govern a view: its template, unless the template leaves filters to the view
+def getFilterHost(doc, view):
+    if idValue(view.ViewTemplateId) == -1: return view
+    template = doc.GetElement(view.ViewTemplateId)
+    if not template: return view
+    filtersParameterId = int(DB.BuiltInParameter.VIS_GRAPHICS_FILTERS)
+    if any(idValue(i) == filtersParameterId for i in template.GetNonControlledTemplateParameterIds()): return view
+    return template
+
+# Returns False when the view already shows the filter with these overrides
+def applyRevisionFilter(view, filterId, ogs):
+    if not view.IsFilterApplied(filterId): view.AddFilter(filterId)
+    elif encodeOverrides(view.GetFilterOverrides(filterId)) == encodeOverrides(ogs): return False
+    view.SetFilterOverrides(filterId, ogs)
+    return True
+
+def getIndexCache():
+    cache = envvars.get_pyrevit_env_var(indexCacheName)
+    if cache is None:
+        cache = {}
+        envvars.set_pyrevit_env_var(indexCacheName, cache)
+    return cache
+
+# Record cloud changes on the cached index, and drop its tag map and line patterns when those change
+def onDocumentChanged(sender, args):
+    index = getIndexCache().get(documentKey(args.GetDocument()))
+    if not index: return
+    cloudFilter = DB.ElementCategoryFilter(DB.BuiltInCategory.OST_RevisionClouds)
+    tagFilter = DB.ElementCategoryFilter(DB.BuiltInCategory.OST_RevisionCloudTags)
+    for elementId in args.GetAddedElementIds(cloudFilter): index.pending.add(idValue(elementId))
+    for elementId in args.GetModifiedElementIds(cloudFilter): index.pending.add(idValue(elementId))
+    patternFilter = DB.ElementClassFilter(DB.LinePatternElement)
+    if args.GetAddedElementIds(tagFilter).Count or args.GetModifiedElementIds(tagFilter).Count: index.tagsByCloud = None
+    if args.GetAddedElementIds(patternFilter).Count or args.GetModifiedElementIds(patternFilter).Count: index.linePatterns = None
+    for elementId in args.GetDeletedElementIds():
+        if idValue(elementId) in index.records: index.pending.add(idValue(elementId))
+        else: index.tagsByCloud, index.linePatterns = None, None
+
+def onDocumentClosing(sender, args):
+    getIndexCache().pop(documentKey(args.Document), None)
+
+def registerHandlers():
+    if envvars.get_pyrevit_env_var(handlerFlagName): return
+    HOST_APP.app.DocumentChanged += onDocumentChanged
+    HOST_APP.app.DocumentClosing += onDocumentClosing
+    envvars.set_pyrevit_env_var(handlerFlagName, True)
+
+# Revision cloud index of a document, built at most once per session
+def getCloudIndex(doc):
+    cache = getIndexCache()
+    key = documentKey(doc)
+    index = cache.get(key)
+    if index is None:
+        registerHandlers()
+        index = CloudIndex(doc)
+        cache[key] = index
+    index.refresh()
+    return index
@@ -0,0 +1,32 @@
+import re
+from pyrevit import DB
+from revitesse.parameters import getCategoryParameterIds, getParameterAccessor, getContainsFilter, isStringParameter
+from revitesse.textnotes import getTextNoteIndex, replaceInNote
+
+# Planned edits grouped for the preview: [(label, [(element id, apply function)])]
+def planParameterChanges(doc, categories, find, replaceWith):
+    pattern = re.compile(re.escape(find), re.IGNORECASE)
+    plans = []
+    for category in categories:
+        for name, parameterId in sorted(getCategoryParameterIds(doc, category).items()):
+            if not isStringParameter(doc, parameterId): continue
+            accessor = getParameterAccessor(doc, parameterId)
+            # Instances and types of the category whose value contains the text, filtered by Revit
+            collector = DB.FilteredElementCollector(doc).OfCategoryId(category.Id).WherePasses(getContainsFilter(parameterId, find))
+            changes = []
+            for elem in collector:
+                param = accessor(elem)
+                if not param or param.IsReadOnly: continue
+                value = param.AsString()
+                if not value: continue
+                newValue = pattern.sub(lambda m: replaceWith, value)
+                if newValue == value: continue
+                changes.append((elem.Id, lambda e, a=accessor, v=newValue: a(e).Set(v)))
+            if changes: plans.append(("{}: {}".format(category.Name, name), changes))
+    return plans
+
+def planTextNoteChanges(doc, find, replaceWith):
+    pattern = re.compile(re.escape(find), re.IGNORECASE)
+    noteIds = getTextNoteIndex(doc).findContains(find)
+    changes = [(DB.ElementId(i), lambda note: replaceInNote(note, pattern, replaceWith, False)) for i in noteIds]
+    return [("Text Notes: Text", changes)] if changes else []
@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+import clr, math, json
+
+clr.AddReference("System.Windows.Forms")
+clr.AddReference("System.Drawing")
+
+from pyrevit import revit, forms, script, DB
+from System.Windows.Forms import Form, Label, TextBox, ComboBox, ComboBoxStyle, CheckBox, Button, FormStartPosition, FormBorderStyle, DialogResult
+from System.Drawing import Point, Size
+from revitesse import idValue
+from revitesse.parameters import getMarkParameterId
+from revitesse.spatial import PointGrid, GridIndex, getElementPoint
+from revitesse.snapshots import saveMarkSnapshot
+
+# Last settings used per category, read by the auto numbering updater
+numberingConfigSection = "RevitesseNumbering"
+
+# Numbering reference that labels elements by their nearest grid intersection instead of a room
+gridReference = "Grid cell"
+
+activePhaseMode = "Active view phase"
+createdPhaseMode = "Each element's created phase"
+
+# Grid cell size in feet for the nearest room search
+roomGridCellSize = 20.0
+
+sortModes = ["Alphabetically: capital letters", "Alphabetically: small letters", "Numerically"]
+orderModes = ["By name or id", "Clockwise around room centre", "Left to right, top to bottom", "Nearest neighbour path from entry"]
+existingModes = ["Renumber all", "Keep existing marks, fill gaps", "Keep existing marks, append after highest"]
+# Elements within this many feet vertically are read as one row
+rowTolerance = 1.0
+
+# Numbering configuration per category: a new category only needs an entry here
+numberingCategories = {
+    "Doors": {"category": DB.BuiltInCategory.OST_Doors, "markParameter": getMarkParameterId(DB.ElementId(DB.BuiltInCategory.OST_Doors)), "roomSides": ["Room To", "Room From"], "singular": "Door", "plural": "doors"},
+    "Windows": {"category": DB.BuiltInCategory.OST_Windows, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room To", "Room From"], "singular": "Window", "plural": "windows"},
+    "Furniture": {"category": DB.BuiltInCategory.OST_Furniture, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Furniture", "plural": "furniture"},
+    "Furniture Systems": {"category": DB.BuiltInCategory.OST_FurnitureSystems, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Furniture System", "plural": "furniture systems"},
+    "Casework": {"category": DB.BuiltInCategory.OST_Casework, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Casework", "plural": "casework"},
+    "Specialty Equipment": {"category": DB.BuiltInCategory.OST_SpecialityEquipment, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Equipment", "plural": "equipment"},
+    "Mechanical Equipment": {"category": DB.BuiltInCategory.OST_MechanicalEquipment, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Equipment", "plural": "equipment"},
+    "Electrical Equipment": {"category": DB.BuiltInCategory.OST_ElectricalEquipment, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Equipment", "plural": "equipment"},
+    "Electrical Fixtures": {"category": DB.BuiltInCategory.OST_ElectricalFixtures, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Fixture", "plural": "fixtures"},
+    "Lighting Fixtures": {"category": DB.BuiltInCategory.OST_LightingFixtures, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Fixture", "plural": "fixtures"},
+    "Plumbing Fixtures": {"category": DB.BuiltInCategory.OST_PlumbingFixtures, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Fixture", "plural": "fixtures"},
+    "Columns": {"category": DB.BuiltInCategory.OST_Columns, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": [gridReference, "Room"], "singular": "Column", "plural": "columns"},
+    "Structural Columns": {"category": DB.BuiltInCategory.OST_StructuralColumns, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": [gridReference, "Room"], "singular": "Column", "plural": "columns"},
+    "Structural Foundations": {"category": DB.BuiltInCategory.OST_StructuralFoundation, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": [gridReference, "Room"], "singular": "Foundation", "plural": "foundations"},
+    "Generic Models": {"category": DB.BuiltInCategory.OST_GenericModel, "markParameter": DB.BuiltInParameter.ALL_MODEL_MARK, "roomSides": ["Room"], "singular": "Element", "plural": "elements"},
+}
+
+def getSettingsOption(categoryName):
+    return categoryName.lower().replace(" ", "_")
+
+def loadNumberingSettings(categoryName):
+    config = script.get_config(numberingConfigSection)
+    try: return json.loads(config.get_option(getSettingsOption(categoryName), "")) or None
+    except: return None
+
+def saveNumberingSettings(categoryName, settings):
+    config = script.get_config(numberingConfigSection)
+    config.set_option(getSettingsOption(categoryName), json.dumps(settings))
+    script.save_config()
+
+def getSeparator(settings):
+    separator = settings["separator"]
+    if separator is None or separator.strip() == "": separator = " "
+    return separator
+
+def collectElements(doc, config):
+    return list(DB.FilteredElementCollector(doc).OfCategory(config["category"]).WhereElementIsNotElementType())
+
+# Save the current marks of all elements of the category to an external snapshot
+def snapshotMarks(doc, config):
+    elements = collectElements(doc, config)
+    if not elements: raise Exception("No {} found to snapshot.".format(config["plural"]))
+    return saveMarkSnapshot(doc, [(elem, config["markParameter"]) for elem in elements], "Number {}".format(config["plural"].title()))
+
+# UI Form
+class NumberingForm(Form):
+    def __init__(self, doc, config, settings=None):
+        self.doc = doc
+        self.config = config
+        self.Text = "{} Numbering".format(config["singular"])
+        self.Size = Size(500, 340)
+        self.StartPosition = FormStartPosition.CenterScreen
+        self.FormBorderStyle = FormBorderStyle.FixedDialog
+        self.MaximizeBox = False
+        self.MinimizeBox = False
+
+        y = 10
+        # Prefix & Suffix
+        self.Controls.Add(Label(Text="Prefix:", Location=Point(220, y), Size=Size(40, 25)))
+        self.prefixBox = TextBox(Location=Point(260, y), Size=Size(70, 25))
+        self.Controls.Add(self.prefixBox)
+        self.Controls.Add(Label(Text="Suffix:", Location=Point(350, y), Size=Size(40, 25)))
+        self.suffixBox = TextBox(Location=Point(400, y), Size=Size(70, 25))
+        self.Controls.Add(self.suffixBox)
+
+        y += 30
+        # Room reference
+        self.Controls.Add(Label(Text="Number by:", Location=Point(20, y), Size=Size(150, 25)))
+        self.roomCombo = ComboBox(Location=Point(220, y), Size=Size(250, 25))
+        self.roomCombo.DropDownStyle = ComboBoxStyle.DropDownList
+        for side in config["roomSides"]: self.roomCombo.Items.Add(side)
+        if gridReference not in config["roomSides"]: self.roomCombo.Items.Add(gridReference)
+        self.roomCombo.SelectedIndex = 0
+        self.Controls.Add(self.roomCombo)
+
+        y += 30
+        # Phase the rooms are read in
+        self.Controls.Add(Label(Text="Phase:", Location=Point(20, y), Size=Size(150, 25)))
+        self.phaseCombo = ComboBox(Location=Point(220, y), Size=Size(250, 25))
+        self.phaseCombo.DropDownStyle = ComboBoxStyle.DropDownList
+        for mode in [activePhaseMode, createdPhaseMode] + [phase.Name for phase in doc.Phases]: self.phaseCombo.Items.Add(mode)
+        self.phaseCombo.SelectedIndex = 0
+        self.Controls.Add(self.phaseCombo)
+
+        y += 30
+        # Separator
+        self.Controls.Add(Label(Text="Separator if multiple {}:".format(config["plural"]), Location=Point(20, y), Size=Size(200, 25)))
+        self.sepBox = TextBox(Location=Point(220, y), Size=Size(250, 25))
+        self.Controls.Add(self.sepBox)
+
+        y += 30
+        # Sort mode
+        self.Controls.Add(Label(Text="Arrange if same room number:", Location=Point(20, y), Size=Size(200, 25)))
+        self.sortCombo = ComboBox(Location=Point(220, y), Size=Size(250, 25))
+        self.sortCombo.DropDownStyle = ComboBoxStyle.DropDownList
+        for mode in sortModes: self.sortCombo.Items.Add(mode)
+        self.sortCombo.SelectedIndex = 0
+        self.Controls.Add(self.sortCombo)
+
+        y += 30
+        # Order within a room
+        self.Controls.Add(Label(Text="Order within room:", Location=Point(20, y), Size=Size(200, 25)))
+        self.orderCombo = ComboBox(Location=Point(220, y), Size=Size(250, 25))
+        self.orderCombo.DropDownStyle = ComboBoxStyle.DropDownList
+        for mode in orderModes: self.orderCombo.Items.Add(mode)
+        self.orderCombo.SelectedIndex = 0
+        self.Controls.Add(self.orderCombo)
+
+        y += 30
+        # Existing marks
+        self.Controls.Add(Label(Text="Existing marks:", Location=Point(20, y), Size=Size(200, 25)))
+        self.existingCombo = ComboBox(Location=Point(220, y), Size=Size(250, 25))
+        self.existingCombo.DropDownStyle = ComboBoxStyle.DropDownList
+        for mode in existingModes: self.existingCombo.Items.Add(mode)
+        self.existingCombo.SelectedIndex = 0
+        self.Controls.Add(self.existingCombo)
+
+        y += 30
+        # Nearest room fallback
+        self.nearestRoomCheck = CheckBox(Text="Use the nearest room for {} without a room".format(config["plural"]), Location=Point(20, y), Size=Size(450, 25))
+        self.nearestRoomCheck.Checked = True
+        self.Controls.Add(self.nearestRoomCheck)
+
+        y += 40
+        # Buttons
+        self.snapshotButton = Button(Text="Snapshot Marks", Location=Point(10, y), Size=Size(150, 30))
+        self.cancelButton = Button(Text="Cancel", Location=Point(320, y), Size=Size(70, 30))
+        self.okButton = Button(Text="OK", Location=Point(400, y), Size=Size(70, 30))
+
+        self.okButton.Click += self.okClicked
+        self.snapshotButton.Click += self.snapshotClicked
+        self.cancelButton.Click += self.cancelClicked
+
+        self.Controls.Add(self.okButton)
+        self.Controls.Add(self.snapshotButton)
+        self.Controls.Add(self.cancelButton)
+        if settings: self.applySettings(settings)
+
+    # Start from the settings of the last run
+    def applySettings(self, settings):
+        self.prefixBox.Text = settings.get("prefix", "")
+        self.suffixBox.Text = settings.get("suffix", "")
+        self.sepBox.Text = settings.get("separator") or ""
+        for combo, key in ((self.roomCombo, "roomReference"), (self.phaseCombo, "phaseMode"), (self.sortCombo, "sortMode"),
+                           (self.orderCombo, "orderMode"), (self.existingCombo, "existingMode")):
+            if settings.get(key) in combo.Items: combo.SelectedItem = settings[key]
+        self.nearestRoomCheck.Checked = settings.get("nearestRoom", True)
+
+    def okClicked(self, sender, args):
+        self.DialogResult = DialogResult.OK
+        self.Close()
+
+    def cancelClicked(self, sender, args):
+        self.DialogResult = DialogResult.Cancel
+        self.Close()
+
+    def snapshotClicked(self, sender, args):
+        try:
+            path, count = snapshotMarks(self.doc, self.config)
+            forms.alert("Snapshot of {} marks saved. Use Restore Marks to bring them back.".format(count), sub_msg=path, title="Snapshot")
+        except Exception as e: forms.alert("Snapshot failed:\n{}".format(str(e)), "Error")
+
+    def getSettings(self):
+        return {"prefix": self.prefixBox.Text or "", "suffix": self.suffixBox.Text or "", "roomReference": self.roomCombo.SelectedItem,
+                "phaseMode": self.phaseCombo.SelectedItem, "separator": self.sepBox.Text, "sortMode": self.sortCombo.SelectedItem,
+                "orderMode": self.orderCombo.SelectedItem, "existingMode": self.existingCombo.SelectedItem, "nearestRoom": self.nearestRoomCheck.Checked}
+
+# Get active phase with multiple fallback scenarios
+def getActivePhase(doc):
+    # Try to get phase from active view first
+    try:
+        phaseParameter = doc.ActiveView.get_Parameter(DB.BuiltInParameter.VIEW_PHASE)
+        if phaseParameter and phaseParameter.AsElementId() != DB.ElementId.InvalidElementId: return doc.GetElement(phaseParameter.AsElementId())
+    except: pass
+
+    # Fallback: get the last phase from the document's phases
+    try:
+        phases = DB.FilteredElementCollector(doc).OfClass(DB.Phase).ToElements()
+        if phases: return list(phases)[-1]
+    except: pass
+    # Final fallback: return None and handle elements without phase
+    return None
+
+# Phase each element is numbered against: its created phase, a named phase, or the active one
+def getElementPhaseFunction(doc, phaseMode):
+    activePhase = getActivePhase(doc)
+    phases = dict((idValue(phase.Id), phase) for phase in doc.Phases)
+    if phaseMode == createdPhaseMode: return lambda elem: phases.get(idValue(elem.CreatedPhaseId)) or activePhase
+    namedPhase = next((phase for phase in phases.values() if phase.Name == phaseMode), None)
+    return lambda elem: namedPhase or activePhase
+
+# Room on the chosen side, falling back to the other side, then to the room without phase
+def getElementRoom(elem, phase, roomReference):
+    room = None
+    if phase:
+        try:
+            if roomReference == "Room To": room = elem.ToRoom[phase] or elem.FromRoom[phase]
+            elif roomReference == "Room From": room = elem.FromRoom[phase] or elem.ToRoom[phase]
+            else: room = elem.Room[phase]
+        except: pass
+
+    # Fallback: try to get room without phase (for models without phases)
+    if not room:
+        try:
+            if roomReference == "Room To": room = elem.ToRoom or elem.FromRoom
+            elif roomReference == "Room From": room = elem.FromRoom or elem.ToRoom
+            else: room = elem.Room
+        except: pass
+    return room
+
+def getRoomNumber(room):
+    try:
+        roomNumberParam = room.get_Parameter(DB.BuiltInParameter.ROOM_NUMBER)
+        return roomNumberParam.AsString() if roomNumberParam else None
+    except: return None
+
+# Placed rooms bucketed per level by centroid, for elements that report no room
+class RoomLocator(object):
+    def __init__(self, rooms):
+        self.grids = {}
+        for room in rooms:
+            box = room.get_BoundingBox(None)
+            if not box: continue
+            levelId = idValue(room.LevelId)
+            if levelId not in self.grids: self.grids[levelId] = PointGrid(roomGridCellSize)
+            self.grids[levelId].add(room, (box.Min.X + box.Max.X) / 2.0, (box.Min.Y + box.Max.Y) / 2.0)
+
+    # Room on the element's level whose centroid is nearest to the element
+    def nearestRoom(self, elem):
+        grid = self.grids.get(idValue(elem.LevelId))
+        point = getElementPoint(elem)
+        if not grid or not point: return None
+        return grid.nearest(point.X, point.Y)
+
+# Rooms resolved once per (element, phase), with the nearest room as an optional fallback
+class RoomResolver(object):
+    def __init__(self, doc, roomReference, useNearestRoom=True):
+        self.doc = doc
+        self.roomReference = roomReference
+        self.useNearestRoom = useNearestRoom
+        self.rooms = {}
+        self.locators = None
+        self.roomNumbers = {}
+        self.points = {}
+        self.centres = {}
+        self.entries = {}
+        # (room number, phase id) -> (phase, room), and element id -> its (room number, phase id)
+        self.groupPlaces = {}
+        self.elementPlaces = {}
+
+    # Room locators of every phase, built from one collection pass over the placed rooms
+    def getLocator(self, phase):
+        if self.locators is None:
+            allRooms = []
+            roomsByPhase = {}
+            for room in DB.FilteredElementCollector(self.doc).OfCategory(DB.BuiltInCategory.OST_Rooms).WhereElementIsNotElementType():
+                if room.Area <= 0: continue
+                allRooms.append(room)
+                roomPhase = room.get_Parameter(DB.BuiltInParameter.ROOM_PHASE)
+                if not roomPhase: continue
+                phaseId = idValue(roomPhase.AsElementId())
+                if phaseId not in roomsByPhase: roomsByPhase[phaseId] = []
+                roomsByPhase[phaseId].append(room)
+            self.locators = dict((phaseId, RoomLocator(rooms)) for phaseId, rooms in roomsByPhase.items())
+            self.locators[None] = RoomLocator(allRooms)
+        key = idValue(phase.Id) if phase else None
+        return self.locators.get(key) or RoomLocator([])
+
+    def getRoom(self, elem, phase):
+        key = (idValue(elem.Id), idValue(phase.Id) if phase else None)
+        if key not in self.rooms:
+            room = getElementRoom(elem, phase, self.roomReference)
+            if not room and self.useNearestRoom: room = self.getLocator(phase).nearestRoom(elem)
+            self.rooms[key] = room
+        return self.rooms[key]
+
+    def getRoomNumber(self, elem, phase):
+        room = self.getRoom(elem, phase)
+        if not room: return None
+        roomId = idValue(room.Id)
+        if roomId not in self.roomNumbers: self.roomNumbers[roomId] = getRoomNumber(room)
+        return self.roomNumbers[roomId]
+
+    def getPoint(self, elem):
+        key = idValue(elem.Id)
+        if key not in self.points: self.points[key] = getElementPoint(elem)
+        return self.points[key]
+
+    # Centre of the room's bounding box
+    def getRoomCentre(self, room):
+        key = idValue(room.Id)
+        if key not in self.centres:
+            box = room.get_BoundingBox(None)
+            self.centres[key] = (box.Min + box.Max) / 2.0 if box else self.getPoint(room)
+        return self.centres[key]
+
+    # Widest door opening into the room, else the lower left corner of the room
+    def getRoomEntry(self, room, phase):
+        phaseKey = idValue(phase.Id) if phase else None
+        if phaseKey not in self.entries: self.entries[phaseKey] = getRoomEntries(self.doc, phase)
+        entry = self.entries[phaseKey].get(idValue(room.Id))
+        if entry: return entry
+        box = room.get_BoundingBox(None)
+        return box.Min if box else self.getRoomCentre(room)
+
+    # Elements of one room number split by the phase they were resolved in: [((phase, room), elements)]
+    def splitByPlace(self, roomElements):
+        places = {}
+        for elem in roomElements:
+            placeKey = self.elementPlaces.get(idValue(elem.Id))
+            if placeKey not in places: places[placeKey] = []
+            places[placeKey].append(elem)
+        return [(self.groupPlaces.get(placeKey, (None, None)), places[placeKey]) for placeKey in sorted(places, key=lambda k: k[1] if k and k[1] is not None else -1)]
+
+# Grid cell labels in place of room numbers, for elements in open floors
+class GridResolver(RoomResolver):
+    def __init__(self, doc):
+        RoomResolver.__init__(self, doc, gridReference, False)
+        self.gridIndex = GridIndex(doc)
+
+    def getRoom(self, elem, phase):
+        return None
+
+    def getRoomNumber(self, elem, phase):
+        point = self.getPoint(elem)
+        return self.gridIndex.getCellLabel(point) if point else None
+
+def getDoorWidth(door):
+    for source in (door, door.Symbol):
+        for parameterId in (DB.BuiltInParameter.DOOR_WIDTH, DB.BuiltInParameter.FAMILY_WIDTH_PARAM):
+            parameter = source.get_Parameter(parameterId) if source else None
+            if parameter and parameter.HasValue: return parameter.AsDouble()
+    return 0.0
+
+# Location of the widest door of every room in one pass over the doors: {room id: point}
+def getRoomEntries(doc, phase):
+    entries = {}
+    for door in DB.FilteredElementCollector(doc).OfCategory(DB.BuiltInCategory.OST_Doors).WhereElementIsNotElementType():
+        point = getElementPoint(door)
+        if not point: continue
+        try: rooms = [door.ToRoom[phase], door.FromRoom[phase]] if phase else [door.ToRoom, door.FromRoom]
+        except: continue
+        width = getDoorWidth(door)
+        for room in rooms:
+            if not room: continue
+            roomId = idValue(room.Id)
+            if roomId not in entries or width > entries[roomId][0]: entries[roomId] = (width, point)
+    return dict((roomId, entry[1]) for roomId, entry in entries.items())
+
+# Single collection and grouping pass: {room number: [elements]} and elements without rooms;
+# the phase only resolves the room, so a room number reused across phases still shares one mark sequence
+def groupElementsByRoom(elements, getPhase, resolver):
+    groups = {}
+    withoutRooms = []
+    for elem in elements:
+        phase = getPhase(elem)
+        roomNumber = resolver.getRoomNumber(elem, phase)
+        if roomNumber:
+            placeKey = (roomNumber, idValue(phase.Id) if phase else None)
+            if placeKey not in resolver.groupPlaces: resolver.groupPlaces[placeKey] = (phase, resolver.getRoom(elem, phase))
+            resolver.elementPlaces[idValue(elem.Id)] = placeKey
+            if roomNumber not in groups: groups[roomNumber] = []
+            groups[roomNumber].append(elem)
+        else: withoutRooms.append(elem)
+    return groups, withoutRooms
+
+# Spreadsheet-style letters: 0 -> A, 25 -> Z, 26 -> AA, 27 -> AB
+def getLetters(index):
+    letters = ""
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+# Suffix of the idx-th element in a room of count elements
+def getNumberSuffix(idx, count, sortMode, separator):
+    if count == 1: return ""
+    if sortMode == "Numerically": return separator + str(idx + 1).zfill(max(2, len(str(count))))
+    letters = getLetters(idx)
+    if sortMode == "Alphabetically: small letters": letters = letters.lower()
+    return separator + letters
+
+# Position of spreadsheet-style letters: A -> 0, AA -> 26
+def getLetterIndex(letters):
+    index = 0
+    for letter in letters.upper(): index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+# Position held by an existing mark in a room, None when the mark was not numbered in it with these settings
+def parseMarkIndex(mark, roomNumber, settings, separator):
+    head, tail, sortMode = settings["prefix"] + roomNumber, settings["suffix"], settings["sortMode"]
+    if not mark or len(mark) < len(head) + len(tail) or not mark.startswith(head) or not mark.endswith(tail): return None
+    middle = mark[len(head):len(mark) - len(tail)]
+    # An unsuffixed mark holds the first position
+    if middle == "": return 0
+    if not middle.startswith(separator): return None
+    token = middle[len(separator):]
+    if sortMode == "Numerically": return int(token) - 1 if token.isdigit() and int(token) > 0 else None
+    if not token or any(not ('A' <= c <= 'Z') for c in token.upper()): return None
+    if sortMode == "Alphabetically: small letters" and token != token.lower(): return None
+    if sortMode == "Alphabetically: capital letters" and token != token.upper(): return None
+    return getLetterIndex(token)
+
+# New marks of a room's ordered elements: {element id: mark}
+def planRoomMarks(roomNumber, elements, settings, separator, currentMarks):
+    count = len(elements)
+    makeMark = lambda idx: settings["prefix"] + roomNumber + getNumberSuffix(idx, count, settings["sortMode"], separator) + settings["suffix"]
+    existingMode = settings.get("existingMode", existingModes[0])
+    if existingMode == existingModes[0]: return dict((idValue(elem.Id), makeMark(idx)) for idx, elem in enumerate(elements))
+
+    # Keep the marks already numbered in this room, the first holder of a duplicated position wins
+    marks = {}
+    taken = set()
+    pending = []
+    for elem in elements:
+        elemId = idValue(elem.Id)
+        index = parseMarkIndex(currentMarks.get(elemId), roomNumber, settings, separator)
+        if index is None or index in taken: pending.append(elemId)
+        else:
+            taken.add(index)
+            marks[elemId] = currentMarks[elemId]
+
+    # Fill the free positions from the start, or continue after the highest one
+    idx = 0 if existingMode == existingModes[1] or not taken else max(taken) + 1
+    for elemId in pending:
+        while idx in taken: idx += 1
+        taken.add(idx)
+        marks[elemId] = makeMark(idx)
+    return marks
+
+def getMark(elem, markParameterId):
+    markParameter = elem.get_Parameter(markParameterId)
+    return markParameter.AsString() or "" if markParameter else ""
+
+# Key a mark is unique under: the mark alone across categories, else (category id, mark)
+def getMarkKey(elem, mark, acrossCategories):
+    return mark if acrossCategories else (idValue(elem.Category.Id), mark)
+
+# Collision groups in one pass over (element, mark) records: {key: [elements]} for keys held by more than one element
+def findDuplicateMarks(records, acrossCategories):
+    groups = {}
+    for elem, mark in records:
+        key = getMarkKey(elem, mark, acrossCategories)
+        if key not in groups: groups[key] = []
+        groups[key].append(elem)
+    return dict((key, elems) for key, elems in groups.items() if len(elems) > 1)
+
+# New marks of the colliding elements: the lowest id keeps its mark, the others get the first free letter suffix
+def resolveDuplicateMarks(duplicates, usedKeys, acrossCategories, separator):
+    newMarks = {}
+    for key, elems in duplicates.items():
+        mark = key if acrossCategories else key[1]
+        idx = 0
+        for elem in sorted(elems, key=lambda e: idValue(e.Id))[1:]:
+            candidate = mark + separator + getLetters(idx)
+            while getMarkKey(elem, candidate, acrossCategories) in usedKeys:
+                idx += 1
+                candidate = mark + separator + getLetters(idx)
+            usedKeys.add(getMarkKey(elem, candidate, acrossCategories))
+            newMarks[idValue(elem.Id)] = (elem, candidate)
+    return newMarks
+
+def sortRoomElements(elements, sortMode):
+    if sortMode == "Alphabetically: capital letters": elements.sort(key=lambda e: e.Name.upper())
+    elif sortMode == "Alphabetically: small letters": elements.sort(key=lambda e: e.Name.lower())
+    elif sortMode == "Numerically": elements.sort(key=lambda e: e.Id)
+
+# Clockwise from north around the centre: items are (element, point)
+def orderClockwise(items, centre):
+    return sorted(items, key=lambda item: math.atan2(item[1].X - centre.X, item[1].Y - centre.Y) % (2 * math.pi))
+
+# Rows from top to bottom, each read from left to right
+def orderByRows(items):
+    rows, rowTop = [], None
+    for item in sorted(items, key=lambda item: -item[1].Y):
+        if rowTop is None or rowTop - item[1].Y > rowTolerance:
+            rows.append([])
+            rowTop = item[1].Y
+        rows[-1].append(item)
+    return [item for row in rows for item in sorted(row, key=lambda item: item[1].X)]
+
+# Walk from the start point, always to the closest remaining element
+def orderNearestNeighbour(items, start):
+    remaining = list(items)
+    ordered = []
+    current = start
+    while remaining:
+        nextItem = min(remaining, key=lambda item: (item[1].X - current.X) ** 2 + (item[1].Y - current.Y) ** 2)
+        remaining.remove(nextItem)
+        ordered.append(nextItem)
+        current = nextItem[1]
+    return ordered
+
+# Order the elements of a room; the name or id order breaks ties and keeps elements without a location last
+def orderRoomElements(elements, room, phase, settings, resolver):
+    sortRoomElements(elements, settings["sortMode"])
+    orderMode = settings.get("orderMode", orderModes[0])
+    if orderMode == orderModes[0] or len(elements) < 2: return elements
+    # Without a room only the row order applies
+    if not room and orderMode != "Left to right, top to bottom": return elements
+    items = [(elem, resolver.getPoint(elem)) for elem in elements]
+    located = [item for item in items if item[1]]
+    unlocated = [item for item in items if not item[1]]
+    if orderMode == "Clockwise around room centre": located = orderClockwise(located, resolver.getRoomCentre(room))
+    elif orderMode == "Left to right, top to bottom": located = orderByRows(located)
+    else: located = orderNearestNeighbour(located, resolver.getRoomEntry(room, phase))
+    return [item[0] for item in located + unlocated]
+
+def getResolver(doc, settings):
+    if settings["roomReference"] == gridReference: return GridResolver(doc)
+    return RoomResolver(doc, settings["roomReference"], settings.get("nearestRoom", True))
+
+# Number all elements of a configured category by room, writing only the marks that change
+def numberElements(doc, config, settings):
+    separator = getSeparator(settings)
+
+    elements = collectElements(doc, config)
+    if not elements: forms.alert("No {} found.".format(config["plural"]), exitscript=True)
+    # Group elements by room number, or grid cell, with fallback logic
+    resolver = getResolver(doc, settings)
+    if settings["roomReference"] == gridReference and not resolver.gridIndex.axes: forms.alert("No straight grids found.", exitscript=True)
+    getPhase = getElementPhaseFunction(doc, settings.get("phaseMode", activePhaseMode))
+    groups, withoutRooms = groupElementsByRoom(elements, getPhase, resolver)
+
+    markParameterId = config["markParameter"]
+    currentMarks = dict((idValue(elem.Id), getMark(elem, markParameterId)) for elem in elements)
+    newMarks = {}
+    for roomNumber, roomElements in groups.items():
+        # Each phase's elements are ordered against the room of that phase, then numbered as one sequence
+        orderedElements = []
+        for (phase, room), placeElements in resolver.splitByPlace(roomElements):
+            orderedElements.extend(orderRoomElements(placeElements, room, phase, settings, resolver))
+        newMarks.update(planRoomMarks(roomNumber, orderedElements, settings, separator, currentMarks))
+
+    # Clear the mark of elements without rooms unless existing marks are kept
+    if settings.get("existingMode", existingModes[0]) == existingModes[0]:
+        for elem in withoutRooms: newMarks[idValue(elem.Id)] = ""
+
+    changed = [elem for elem in elements if idValue(elem.Id) in newMarks and newMarks[idValue(elem.Id)] != currentMarks[idValue(elem.Id)]]
+    if changed:
+        t3 = DB.Transaction(doc, "Number {}".format(config["plural"].title()))
+        t3.Start()
+        for elem in changed:
+            markParameter = elem.get_Parameter(markParameterId)
+            if markParameter and not markParameter.IsReadOnly: markParameter.Set(newMarks[idValue(elem.Id)])
+        t3.Commit()
+    forms.alert("{} numbering completed.".format(config["singular"]), sub_msg="{} of {} marks changed.".format(len(changed), len(elements)), title="Success")
+
+# Entry point shared by the numbering buttons
+def runNumberingTool(categoryName):
+    doc = revit.doc
+    config = numberingCategories[categoryName]
+    form = NumberingForm(doc, config, loadNumberingSettings(categoryName))
+    if form.ShowDialog() == DialogResult.OK:
+        settings = form.getSettings()
+        saveNumberingSettings(categoryName, settings)
+        numberElements(doc, config, settings)
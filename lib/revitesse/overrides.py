@@ -0,0 +1,125 @@
+import os, re, json, gzip
+import System
+from pyrevit import DB
+from revitesse import idValue, documentKey
+
+# Previous graphic overrides of the elements Revitesse changed, one gzipped JSON file per document:
+# {"viewId:elementId": {field: value}} with only the fields that differ from a blank override
+storeExtension = ".overrides.json.gz"
+
+# (key, getter, setter, kind) of each stored override property
+overrideFields = [
+    ("plc", "ProjectionLineColor", "SetProjectionLineColor", "color"),
+    ("plp", "ProjectionLinePatternId", "SetProjectionLinePatternId", "id"),
+    ("plw", "ProjectionLineWeight", "SetProjectionLineWeight", "int"),
+    ("clc", "CutLineColor", "SetCutLineColor", "color"),
+    ("clp", "CutLinePatternId", "SetCutLinePatternId", "id"),
+    ("clw", "CutLineWeight", "SetCutLineWeight", "int"),
+    ("sfp", "SurfaceForegroundPatternId", "SetSurfaceForegroundPatternId", "id"),
+    ("sfc", "SurfaceForegroundPatternColor", "SetSurfaceForegroundPatternColor", "color"),
+    ("sfv", "IsSurfaceForegroundPatternVisible", "SetSurfaceForegroundPatternVisible", "bool"),
+    ("sbp", "SurfaceBackgroundPatternId", "SetSurfaceBackgroundPatternId", "id"),
+    ("sbc", "SurfaceBackgroundPatternColor", "SetSurfaceBackgroundPatternColor", "color"),
+    ("sbv", "IsSurfaceBackgroundPatternVisible", "SetSurfaceBackgroundPatternVisible", "bool"),
+    ("cfp", "CutForegroundPatternId", "SetCutForegroundPatternId", "id"),
+    ("cfc", "CutForegroundPatternColor", "SetCutForegroundPatternColor", "color"),
+    ("cfv", "IsCutForegroundPatternVisible", "SetCutForegroundPatternVisible", "bool"),
+    ("cbp", "CutBackgroundPatternId", "SetCutBackgroundPatternId", "id"),
+    ("cbc", "CutBackgroundPatternColor", "SetCutBackgroundPatternColor", "color"),
+    ("cbv", "IsCutBackgroundPatternVisible", "SetCutBackgroundPatternVisible", "bool"),
+    ("tr", "Transparency", "SetSurfaceTransparency", "int"),
+    ("ht", "Halftone", "SetHalftone", "bool"),
+    ("dl", "DetailLevel", "SetDetailLevel", "detail"),
+]
+blankValues = {}
+
+def encodeValue(value, kind):
+    if kind == "color": return [value.Red, value.Green, value.Blue] if value.IsValid else None
+    if kind == "id": return idValue(value)
+    if kind == "bool": return bool(value)
+    return int(value)
+
+def decodeValue(value, kind):
+    if kind == "color": return DB.Color(value[0], value[1], value[2])
+    if kind == "id": return DB.ElementId(value)
+    if kind == "detail": return System.Enum.ToObject(DB.ViewDetailLevel, value)
+    return value
+
+def readFields(ogs):
+    values = {}
+    for key, getter, setter, kind in overrideFields:
+        try: values[key] = encodeValue(getattr(ogs, getter), kind)
+        except: pass
+    return values
+
+# Compact form of an override: the fields that differ from a blank one
+def encodeOverrides(ogs):
+    if not blankValues: blankValues.update(readFields(DB.OverrideGraphicSettings()))
+    return dict((key, value) for key, value in readFields(ogs).items() if value != blankValues.get(key))
+
+def decodeOverrides(values):
+    ogs = DB.OverrideGraphicSettings()
+    for key, getter, setter, kind in overrideFields:
+        if key in values: getattr(ogs, setter)(decodeValue(values[key], kind))
+    return ogs
+
+def getStorePath(doc):
+    root = os.environ.get("APPDATA") or os.environ.get("TEMP")
+    folder = os.path.join(root, "Revitesse", "Cloud Overrides")
+    if not os.path.isdir(folder): os.makedirs(folder)
+    return os.path.join(folder, re.sub(r'[\\/:*?"<>|]', "_", documentKey(doc)) + storeExtension)
+
+def loadOverrideStore(doc):
+    path = getStorePath(doc)
+    if not os.path.isfile(path): return {}
+    f = gzip.open(path, "rb")
+    try: return json.loads(f.read())
+    except: return {}
+    finally: f.close()
+
+def saveOverrideStore(doc, store):
+    path = getStorePath(doc)
+    if not store:
+        if os.path.isfile(path): os.remove(path)
+        return
+    f = gzip.open(path, "wb")
+    try: f.write(json.dumps(store, separators=(",", ":")))
+    finally: f.close()
+
+def getStoreKey(viewId, elementId):
+    return "{}:{}".format(idValue(viewId), idValue(elementId))
+
+# Keep the state an element had before Revitesse first changed it; later changes leave it alone
+def recordOverrides(store, view, elementId, ogs):
+    key = getStoreKey(view.Id, elementId)
+    if key in store: return False
+    store[key] = encodeOverrides(ogs)
+    return True
+
+# Put the stored overrides back in one transaction, skipping elements that already match;
+# returns (restored, unchanged, missing, failed). Entries whose view or element no longer exists are
+# dropped, and only the entries that could not be written stay in the store for a later retry
+def restoreOverrideStore(doc, store):
+    restored, unchanged, missing, failed = 0, 0, 0, 0
+    views = {}
+    t = DB.Transaction(doc, "Restore Revision Cloud Overrides")
+    t.Start()
+    for key, values in list(store.items()):
+        viewId, elementId = [int(part) for part in key.split(":")]
+        if viewId not in views: views[viewId] = doc.GetElement(DB.ElementId(viewId))
+        view = views[viewId]
+        elementId = DB.ElementId(elementId)
+        if not isinstance(view, DB.View) or not doc.GetElement(elementId):
+            missing += 1
+            del store[key]
+            continue
+        if encodeOverrides(view.GetElementOverrides(elementId)) == values: unchanged += 1
+        else:
+            try: view.SetElementOverrides(elementId, decodeOverrides(values))
+            except:
+                failed += 1
+                continue
+            restored += 1
+        del store[key]
+    t.Commit()
+    return restored, unchanged, missing, failed
@@ -0,0 +1,66 @@
+from pyrevit import DB
+from System import Enum
+from System.Collections.Generic import List
+from revitesse import idValue
+
+def getBuiltInParameter(parameterId):
+    return Enum.ToObject(DB.BuiltInParameter, idValue(parameterId))
+
+# Categories whose mark is held by a parameter other than the model Mark
+categoryMarkParameters = {int(DB.BuiltInCategory.OST_Doors): DB.BuiltInParameter.DOOR_NUMBER}
+
+# Mark parameter of a category: its own one, else the model Mark
+def getMarkParameterId(categoryId):
+    return categoryMarkParameters.get(idValue(categoryId), DB.BuiltInParameter.ALL_MODEL_MARK)
+
+# Get the filterable parameters of a category as {name: parameterId}, without walking its instances
+def getCategoryParameterIds(doc, category):
+    parameterIds = {}
+    categoryIds = List[DB.ElementId]([category.Id])
+    for parameterId in DB.ParameterFilterUtilities.GetFilterableParametersInCommon(doc, categoryIds):
+        if idValue(parameterId) < 0:
+            try: name = DB.LabelUtils.GetLabelFor(getBuiltInParameter(parameterId))
+            except: continue
+        else:
+            parameterElement = doc.GetElement(parameterId)
+            if not parameterElement: continue
+            name = parameterElement.Name
+        if name and name not in parameterIds: parameterIds[name] = parameterId
+    return parameterIds
+
+# Whether a filterable parameter stores text
+def isStringParameter(doc, parameterId):
+    try:
+        if idValue(parameterId) < 0: return doc.get_TypeOfStorage(getBuiltInParameter(parameterId)) == DB.StorageType.String
+        dataType = doc.GetElement(parameterId).GetDefinition().GetDataType()
+        return dataType in (DB.SpecTypeId.String.Text, DB.SpecTypeId.String.MultilineText)
+    except: return False
+
+# "Contains" filter evaluated inside Revit, so only candidate elements reach Python
+def getContainsFilter(parameterId, text):
+    provider = DB.ParameterValueProvider(parameterId)
+    try: rule = DB.FilterStringRule(provider, DB.FilterStringContains(), text)
+    except TypeError: rule = DB.FilterStringRule(provider, DB.FilterStringContains(), text, False)
+    return DB.ElementParameterFilter(rule)
+
+# Resolve a parameter id to a getter once per category instead of scanning elem.Parameters per element;
+# with fromType, parameters the instance does not have are read from its type
+def getParameterAccessor(doc, parameterId, fromType=False):
+    if idValue(parameterId) < 0:
+        builtInParameter = getBuiltInParameter(parameterId)
+        accessor = lambda elem: elem.get_Parameter(builtInParameter)
+    else:
+        parameterElement = doc.GetElement(parameterId)
+        if isinstance(parameterElement, DB.SharedParameterElement):
+            guid = parameterElement.GuidValue
+            accessor = lambda elem: elem.get_Parameter(guid)
+        else:
+            name = parameterElement.Name
+            accessor = lambda elem: elem.LookupParameter(name)
+    if not fromType: return accessor
+    def typeAccessor(elem):
+        param = accessor(elem)
+        if param: return param
+        elemType = doc.GetElement(elem.GetTypeId())
+        return accessor(elemType) if elemType else None
+    return typeAccessor
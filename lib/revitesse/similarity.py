@@ -0,0 +1,70 @@
+import re, random
+
+wordPattern = re.compile(r"\w+", re.UNICODE)
+largePrime = 4294967311
+signatureSize = 64
+bandRows = 4
+# Buckets larger than this are compared against their first member only
+maximumPairwiseBucket = 50
+
+# Character trigrams of each word, so punctuation, case and word order do not matter
+def getShingles(text):
+    shingles = set()
+    for word in wordPattern.findall(text.lower()):
+        padded = " " + word + " "
+        for i in range(len(padded) - 2): shingles.add(padded[i:i + 3])
+    return shingles
+
+def jaccard(a, b):
+    if not a and not b: return 1.0
+    return len(a & b) / float(len(a | b))
+
+# MinHash signatures with a fixed seed so clusters are stable between runs
+class MinHasher(object):
+    def __init__(self, size=signatureSize, seed=1):
+        rng = random.Random(seed)
+        self.coefficients = [(rng.randint(1, largePrime - 1), rng.randint(0, largePrime - 1)) for _ in range(size)]
+
+    def signature(self, shingles):
+        hashes = [hash(s) & 0xffffffff for s in shingles]
+        return [min((a * h + b) % largePrime for h in hashes) for a, b in self.coefficients]
+
+# Groups of similar texts; only texts sharing an LSH band bucket are compared, never every pair
+def clusterSimilarTexts(texts, threshold=0.6):
+    hasher = MinHasher()
+    shingles = {}
+    buckets = {}
+    for text in texts:
+        textShingles = getShingles(text)
+        if not textShingles: continue
+        shingles[text] = textShingles
+        signature = hasher.signature(textShingles)
+        for band in range(0, len(signature), bandRows):
+            bucketKey = (band, tuple(signature[band:band + bandRows]))
+            if bucketKey not in buckets: buckets[bucketKey] = []
+            buckets[bucketKey].append(text)
+
+    parent = dict((t, t) for t in shingles)
+    def find(t):
+        while parent[t] != t:
+            parent[t] = parent[parent[t]]
+            t = parent[t]
+        return t
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2: continue
+        if len(members) > maximumPairwiseBucket: pairs = [(members[0], m) for m in members[1:]]
+        else: pairs = [(a, b) for i, a in enumerate(members) for b in members[i + 1:]]
+        for a, b in pairs:
+            rootA, rootB = find(a), find(b)
+            if rootA == rootB or (a, b) in checked: continue
+            checked.add((a, b))
+            if jaccard(shingles[a], shingles[b]) >= threshold: parent[rootB] = rootA
+
+    clusters = {}
+    for text in shingles:
+        root = find(text)
+        if root not in clusters: clusters[root] = []
+        clusters[root].append(text)
+    return [sorted(c) for c in clusters.values() if len(c) > 1]
@@ -0,0 +1,79 @@
+import os, re, json, gzip, datetime
+from pyrevit import DB
+from revitesse import documentKey
+
+# Mark snapshots are gzipped JSON lines outside the model: a header line, then [UniqueId, parameter, mark] per element
+snapshotExtension = ".marks.json.gz"
+
+def getSnapshotFolder(doc):
+    root = os.environ.get("APPDATA") or os.environ.get("TEMP")
+    folder = os.path.join(root, "Revitesse", "Mark Snapshots", re.sub(r'[\\/:*?"<>|]', "_", documentKey(doc)))
+    if not os.path.isdir(folder): os.makedirs(folder)
+    return folder
+
+def getMarkValue(parameter):
+    return parameter.AsString() or "" if parameter else ""
+
+# Write the marks of (element, mark parameter) records in one streaming pass, returns the snapshot path and count
+def saveMarkSnapshot(doc, records, label):
+    created = datetime.datetime.now()
+    path = os.path.join(getSnapshotFolder(doc), created.strftime("%Y%m%d-%H%M%S-%f") + snapshotExtension)
+    parameterNames = {}
+    count = 0
+    f = gzip.open(path, "wb")
+    try:
+        f.write(json.dumps({"document": doc.Title, "label": label, "created": created.strftime("%Y-%m-%d %H:%M:%S")}) + "\n")
+        for elem, markParameterId in records:
+            if markParameterId not in parameterNames: parameterNames[markParameterId] = str(markParameterId)
+            f.write(json.dumps([elem.UniqueId, parameterNames[markParameterId], getMarkValue(elem.get_Parameter(markParameterId))]) + "\n")
+            count += 1
+    finally: f.close()
+    return path, count
+
+def readSnapshotHeader(path):
+    f = gzip.open(path, "rb")
+    try: return json.loads(f.readline())
+    finally: f.close()
+
+# Snapshots of the document as (path, header), newest first
+def listMarkSnapshots(doc):
+    folder = getSnapshotFolder(doc)
+    snapshots = []
+    for name in sorted(os.listdir(folder), reverse=True):
+        if not name.endswith(snapshotExtension): continue
+        path = os.path.join(folder, name)
+        try: snapshots.append((path, readSnapshotHeader(path)))
+        except: pass
+    return snapshots
+
+def iterSnapshotRecords(path):
+    f = gzip.open(path, "rb")
+    try:
+        f.readline()
+        for line in f:
+            if line.strip(): yield json.loads(line)
+    finally: f.close()
+
+# Elements whose current mark differs from the snapshot: [(element, parameter, snapshot mark, current mark)]
+def diffMarkSnapshot(doc, path):
+    differences = []
+    missing = 0
+    parameterIds = {}
+    for uniqueId, parameterName, mark in iterSnapshotRecords(path):
+        elem = doc.GetElement(uniqueId)
+        if not elem:
+            missing += 1
+            continue
+        if parameterName not in parameterIds: parameterIds[parameterName] = getattr(DB.BuiltInParameter, parameterName)
+        parameter = elem.get_Parameter(parameterIds[parameterName])
+        if not parameter or parameter.IsReadOnly: continue
+        current = getMarkValue(parameter)
+        if current != mark: differences.append((elem, parameter, mark, current))
+    return differences, missing
+
+# Write back only the differing marks
+def restoreMarkDifferences(doc, differences):
+    t = DB.Transaction(doc, "Restore Marks")
+    t.Start()
+    for elem, parameter, mark, current in differences: parameter.Set(mark)
+    t.Commit()
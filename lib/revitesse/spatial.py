@@ -0,0 +1,108 @@
+import math, bisect
+from pyrevit import DB
+
+# Pairs of overlapping rectangles with a sweep line along X: rects are (key, minX, minY, maxX, maxY)
+def findOverlaps(rects):
+    overlaps = []
+    active = []
+    for rect in sorted(rects, key=lambda r: r[1]):
+        key, minX, minY, maxX, maxY = rect
+        active = [a for a in active if a[3] > minX]
+        for other in active:
+            if other[2] < maxY and minY < other[4]: overlaps.append((other[0], key))
+        active.append(rect)
+    return overlaps
+
+# Rectangle of a bounding box in the plane of a view, in view right/up coordinates
+def getViewRect(box, view):
+    right, up = view.RightDirection, view.UpDirection
+    transform = box.Transform
+    us, vs = [], []
+    for x in (box.Min.X, box.Max.X):
+        for y in (box.Min.Y, box.Max.Y):
+            for z in (box.Min.Z, box.Max.Z):
+                point = transform.OfPoint(DB.XYZ(x, y, z))
+                us.append(point.DotProduct(right))
+                vs.append(point.DotProduct(up))
+    return min(us), min(vs), max(us), max(vs)
+
+# Location point of an element, the centre of its bounding box when it has none
+def getElementPoint(elem):
+    location = elem.Location
+    if isinstance(location, DB.LocationPoint): return location.Point
+    if isinstance(location, DB.LocationCurve): return location.Curve.Evaluate(0.5, True)
+    box = elem.get_BoundingBox(None)
+    if box: return (box.Min + box.Max) / 2.0
+    return None
+
+# Uniform grid of 2D points for nearest-point queries
+class PointGrid(object):
+    def __init__(self, cellSize):
+        self.cellSize = float(cellSize)
+        self.cells = {}
+        self.bounds = None
+
+    def getCell(self, x, y):
+        return int(math.floor(x / self.cellSize)), int(math.floor(y / self.cellSize))
+
+    def add(self, key, x, y):
+        cell = self.getCell(x, y)
+        if cell not in self.cells: self.cells[cell] = []
+        self.cells[cell].append((key, x, y))
+        if self.bounds is None: self.bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else: self.bounds = [min(self.bounds[0], cell[0]), min(self.bounds[1], cell[1]), max(self.bounds[2], cell[0]), max(self.bounds[3], cell[1])]
+
+    # Key of the nearest point, searching rings of cells outwards until no closer point can remain
+    def nearest(self, x, y):
+        if not self.cells: return None
+        cx, cy = self.getCell(x, y)
+        maxRing = max(abs(cx - self.bounds[0]), abs(cx - self.bounds[2]), abs(cy - self.bounds[1]), abs(cy - self.bounds[3]))
+        best, bestDistance = None, None
+        for ring in range(maxRing + 1):
+            for i in range(cx - ring, cx + ring + 1):
+                for j in range(cy - ring, cy + ring + 1):
+                    if max(abs(i - cx), abs(j - cy)) != ring: continue
+                    for key, px, py in self.cells.get((i, j), ()):
+                        distance = math.hypot(px - x, py - y)
+                        if bestDistance is None or distance < bestDistance: best, bestDistance = key, distance
+            if bestDistance is not None and bestDistance <= ring * self.cellSize: break
+        return best
+
+def isNumberedAxis(grids):
+    return bool(grids) and all(name.isdigit() for position, name in grids)
+
+# Straight grids read once and sorted per axis; a point maps to its nearest grid on each axis by binary search over the midpoints
+class GridIndex(object):
+    def __init__(self, doc):
+        xGrids, yGrids = [], []
+        for grid in DB.FilteredElementCollector(doc).OfClass(DB.Grid):
+            if grid.IsCurved: continue
+            line = grid.Curve
+            middle = line.Evaluate(0.5, True)
+            if abs(line.Direction.Y) >= abs(line.Direction.X): xGrids.append((middle.X, grid.Name))
+            else: yGrids.append((middle.Y, grid.Name))
+        # Lettered grids lead the label, as in "C-4"
+        if isNumberedAxis(yGrids) and not isNumberedAxis(xGrids): self.axes = [("X", self.buildAxis(xGrids)), ("Y", self.buildAxis(yGrids))]
+        else: self.axes = [("Y", self.buildAxis(yGrids)), ("X", self.buildAxis(xGrids))]
+        self.axes = [(coordinate, axis) for coordinate, axis in self.axes if axis[1]]
+
+    # Interval bounds and the grid name of each interval
+    def buildAxis(self, grids):
+        grids.sort()
+        bounds = [(grids[i][0] + grids[i + 1][0]) / 2.0 for i in range(len(grids) - 1)]
+        return bounds, [name for position, name in grids]
+
+    def getCellLabel(self, point, separator="-"):
+        if not self.axes: return None
+        parts = []
+        for coordinate, (bounds, names) in self.axes:
+            parts.append(names[bisect.bisect(bounds, point.X if coordinate == "X" else point.Y)])
+        return separator.join(parts)
+
+    # Bounds of a point's cell on each axis, None where the cell is open towards the outermost grid
+    def getCellBounds(self, point):
+        cellBounds = {"X": (None, None), "Y": (None, None)}
+        for coordinate, (bounds, names) in self.axes:
+            i = bisect.bisect(bounds, point.X if coordinate == "X" else point.Y)
+            cellBounds[coordinate] = (bounds[i - 1] if i > 0 else None, bounds[i] if i < len(bounds) else None)
+        return cellBounds
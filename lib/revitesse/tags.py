@@ -0,0 +1,86 @@
+from System import Enum
+from pyrevit import DB, forms
+from revitesse import idValue
+
+# Keys of the elements a tag points at: local elements as integer ids,
+# linked elements as (link instance id, linked element id) pairs
+def getTaggedKeys(tag):
+    if not hasattr(tag, "GetTaggedReferences"): return set(idValue(i) for i in tag.GetTaggedLocalElementIds())
+    keys = set()
+    for reference in tag.GetTaggedReferences():
+        if reference.LinkedElementId != DB.ElementId.InvalidElementId: keys.add((idValue(reference.ElementId), idValue(reference.LinkedElementId)))
+        else: keys.add(idValue(reference.ElementId))
+    return keys
+
+# Reverse index of tags built in one pass over the tag collector, covering multi-reference and linked-element tags:
+# tagged element key -> [(tag id, owner view id)] and owner view id -> tagged element keys
+class TagIndex(object):
+    def __init__(self, doc, viewId=None):
+        self.byElement = {}
+        self.byView = {}
+        if viewId: tagCollector = DB.FilteredElementCollector(doc, viewId).OfClass(DB.IndependentTag)
+        else: tagCollector = DB.FilteredElementCollector(doc).OfClass(DB.IndependentTag)
+        for tag in tagCollector: self.addTag(tag)
+
+    def addTag(self, tag):
+        try: taggedKeys = getTaggedKeys(tag)
+        except: return
+        entry = (tag.Id, tag.OwnerViewId)
+        viewKey = idValue(tag.OwnerViewId)
+        if viewKey not in self.byView: self.byView[viewKey] = set()
+        for key in taggedKeys:
+            if key not in self.byElement: self.byElement[key] = []
+            self.byElement[key].append(entry)
+            self.byView[viewKey].add(key)
+
+    def tagsForElement(self, elementId, linkInstanceId=None):
+        if linkInstanceId: return self.byElement.get((idValue(linkInstanceId), idValue(elementId)), [])
+        return self.byElement.get(idValue(elementId), [])
+
+    def taggedInView(self, viewId):
+        return self.byView.get(idValue(viewId), set())
+
+# Tag categories able to tag a model category: its own, by the OST_<Name>Tags or OST_<Singular>Tags naming, and multi-category tags
+def getTagCategoryIds(categoryId):
+    tagCategoryIds = set([int(DB.BuiltInCategory.OST_MultiCategoryTags)])
+    try: name = str(Enum.ToObject(DB.BuiltInCategory, idValue(categoryId)))
+    except: return tagCategoryIds
+    candidates = [name + "Tags"]
+    if name.endswith("s"): candidates.append(name[:-1] + "Tags")
+    for candidate in candidates:
+        tagCategory = getattr(DB.BuiltInCategory, candidate, None)
+        if tagCategory is not None: tagCategoryIds.add(int(tagCategory))
+    return tagCategoryIds
+
+# Elements tagged in a view, including the tags a dependent view shows from its primary view
+def getTaggedInView(view, tagIndex):
+    taggedIds = tagIndex.taggedInView(view.Id)
+    try:
+        primaryViewId = view.GetPrimaryViewId()
+        if primaryViewId != DB.ElementId.InvalidElementId: taggedIds = taggedIds | tagIndex.taggedInView(primaryViewId)
+    except: pass
+    return taggedIds
+
+# Visible elements of a category in a view, and those without a tag in that view
+def getUntaggedInView(doc, view, categoryId, tagIndex):
+    visibleIds = DB.FilteredElementCollector(doc, view.Id).OfCategoryId(categoryId).WhereElementIsNotElementType().ToElementIds()
+    taggedIds = getTaggedInView(view, tagIndex)
+    untaggedIds = [i for i in visibleIds if idValue(i) not in taggedIds]
+    return visibleIds.Count, untaggedIds
+
+# Views that can carry tags, either picked directly or taken from the chosen sheets;
+# includeSheets also returns the sheets themselves for annotations drawn on them
+def selectTargetViews(doc, message="Use elements in:", includeSheets=False):
+    source = forms.CommandSwitchWindow.show(["Views", "Sheets"], message=message)
+    if not source: return []
+    if source == "Sheets":
+        sheets = forms.select_sheets(title="Select Sheets", multiple=True) or []
+        views, seen = [], set()
+        for sheet in sheets:
+            if includeSheets: views.append(sheet)
+            for viewId in sheet.GetAllPlacedViews():
+                if idValue(viewId) in seen: continue
+                seen.add(idValue(viewId))
+                views.append(doc.GetElement(viewId))
+        return views
+    return forms.select_views(title="Select Views", multiple=True, filterfunc=lambda v: not v.IsTemplate and not isinstance(v, DB.ViewSheet)) or []
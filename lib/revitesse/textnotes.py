@@ -0,0 +1,195 @@
+from pyrevit import DB, HOST_APP
+from pyrevit.coreutils import envvars
+from revitesse import idValue, documentKey
+
+indexCacheName = "REVITESSE_TEXTNOTEINDEX"
+handlerFlagName = "REVITESSE_TEXTNOTEINDEX_HANDLER"
+
+# Text used as the index key
+def normalizeText(text):
+    return text.strip() if text else ""
+
+# Long notes, number strips and letter grids are not offered as exact values
+def isSystemText(text):
+    return (len(text) > 150 or
+            '123456789' in text.replace(' ', '') or
+            sum(1 for w in text.split() if len(w) == 1 and w.isalpha()) > 10)
+
+# Matches in a note's plain text whose replacement actually changes it, as (start, length, replacement)
+def getNoteReplacements(plainText, pattern, replaceWith, expand):
+    replacements = []
+    for m in pattern.finditer(plainText):
+        if m.end() == m.start(): continue
+        replacement = m.expand(replaceWith) if expand else replaceWith
+        if replacement != m.group(0): replacements.append((m.start(), m.end() - m.start(), replacement))
+    return replacements
+
+# Replace only the changing ranges through the formatted text so bold, italic and underline survive
+def replaceInNote(note, pattern, replaceWith, expand):
+    formattedText = note.GetFormattedText()
+    replacements = getNoteReplacements(formattedText.GetPlainText(), pattern, replaceWith, expand)
+    for start, length, replacement in reversed(replacements): formattedText.SetPlainText(DB.TextRange(start, length), replacement)
+    if replacements: note.SetFormattedText(formattedText)
+    return len(replacements)
+
+def getTrigrams(text):
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+# Owner views whose text notes show in a scope, None for the entire model
+def getScopeViewIds(doc, scope):
+    if scope != "Active View": return None
+    view = doc.ActiveView
+    viewIds = set([idValue(view.Id)])
+    try:
+        primaryViewId = view.GetPrimaryViewId()
+        if primaryViewId != DB.ElementId.InvalidElementId: viewIds.add(idValue(primaryViewId))
+    except: pass
+    return viewIds
+
+# Index of every text note in a document, keyed by normalized text and owner view
+class TextNoteIndex(object):
+    def __init__(self, doc):
+        self.doc = doc
+        self.notes = {}
+        self.byText = {}
+        self.byView = {}
+        self.systemTexts = {}
+        # Lowercase trigram -> distinct texts containing it, built on the first "contains" search
+        self.trigrams = None
+        self.pending = set()
+        collector = DB.FilteredElementCollector(doc).OfCategory(DB.BuiltInCategory.OST_TextNotes).WhereElementIsNotElementType()
+        for note in collector: self.addNote(note)
+
+    def addNote(self, note):
+        key = normalizeText(note.Text)
+        noteId, viewId = idValue(note.Id), idValue(note.OwnerViewId)
+        self.notes[noteId] = (key, viewId)
+        if key not in self.byText:
+            self.byText[key] = set()
+            if self.trigrams is not None: self.addTrigrams(key)
+        self.byText[key].add(noteId)
+        if viewId not in self.byView: self.byView[viewId] = set()
+        self.byView[viewId].add(noteId)
+
+    def removeNote(self, noteId):
+        record = self.notes.pop(noteId, None)
+        if not record: return
+        key, viewId = record
+        self.byText[key].discard(noteId)
+        if not self.byText[key]:
+            del self.byText[key]
+            if self.trigrams is not None: self.removeTrigrams(key)
+        self.byView[viewId].discard(noteId)
+
+    def addTrigrams(self, key):
+        for gram in getTrigrams(key.lower()):
+            if gram not in self.trigrams: self.trigrams[gram] = set()
+            self.trigrams[gram].add(key)
+
+    def removeTrigrams(self, key):
+        for gram in getTrigrams(key.lower()):
+            postings = self.trigrams.get(gram)
+            if postings is None: continue
+            postings.discard(key)
+            if not postings: del self.trigrams[gram]
+
+    # Distinct texts that can contain the lowercase needle: the intersection of its trigram postings, smallest first
+    def getContainsCandidates(self, needle):
+        if len(needle) < 3: return self.byText.keys()
+        if self.trigrams is None:
+            self.trigrams = {}
+            for key in self.byText: self.addTrigrams(key)
+        postings = []
+        for gram in getTrigrams(needle):
+            if gram not in self.trigrams: return []
+            postings.append(self.trigrams[gram])
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates: break
+        return candidates
+
+    # Apply the changes recorded by the DocumentChanged handler since the last use
+    def refresh(self):
+        if not self.pending: return
+        pending, self.pending = self.pending, set()
+        for noteId in pending:
+            self.removeNote(noteId)
+            note = self.doc.GetElement(DB.ElementId(noteId))
+            if isinstance(note, DB.TextNote): self.addNote(note)
+
+    def noteIdsInScope(self, viewIds):
+        if viewIds is None: return None
+        noteIds = set()
+        for viewId in viewIds: noteIds.update(self.byView.get(viewId, ()))
+        return noteIds
+
+    def isSystemText(self, key):
+        if key not in self.systemTexts: self.systemTexts[key] = isSystemText(key)
+        return self.systemTexts[key]
+
+    # Distinct non-system text values, limited to the notes of the given owner views
+    def getTextValues(self, viewIds=None):
+        if viewIds is None: keys = self.byText.keys()
+        else: keys = set(self.notes[i][0] for i in self.noteIdsInScope(viewIds))
+        return sorted(k for k in keys if k and not self.isSystemText(k))
+
+    def findExact(self, text, viewIds=None):
+        noteIds = self.byText.get(normalizeText(text), set())
+        if viewIds is None: return list(noteIds)
+        return list(noteIds & self.noteIdsInScope(viewIds))
+
+    def findContains(self, text, viewIds=None):
+        needle = text.lower()
+        noteIds = set()
+        for key in self.getContainsCandidates(needle):
+            if needle in key.lower(): noteIds.update(self.byText[key])
+        if viewIds is None: return list(noteIds)
+        return list(noteIds & self.noteIdsInScope(viewIds))
+
+    # The pattern is tested once per distinct text, not once per note
+    def findRegex(self, pattern, viewIds=None):
+        noteIds = set()
+        for key, ids in self.byText.items():
+            if pattern.search(key): noteIds.update(ids)
+        if viewIds is None: return list(noteIds)
+        return list(noteIds & self.noteIdsInScope(viewIds))
+
+def getIndexCache():
+    cache = envvars.get_pyrevit_env_var(indexCacheName)
+    if cache is None:
+        cache = {}
+        envvars.set_pyrevit_env_var(indexCacheName, cache)
+    return cache
+
+# Record text note changes on the cached index so it is updated incrementally instead of rebuilt
+def onDocumentChanged(sender, args):
+    index = getIndexCache().get(documentKey(args.GetDocument()))
+    if not index: return
+    textNoteFilter = DB.ElementCategoryFilter(DB.BuiltInCategory.OST_TextNotes)
+    for elementId in args.GetAddedElementIds(textNoteFilter): index.pending.add(idValue(elementId))
+    for elementId in args.GetModifiedElementIds(textNoteFilter): index.pending.add(idValue(elementId))
+    for elementId in args.GetDeletedElementIds():
+        if idValue(elementId) in index.notes: index.pending.add(idValue(elementId))
+
+def onDocumentClosing(sender, args):
+    getIndexCache().pop(documentKey(args.Document), None)
+
+def registerHandlers():
+    if envvars.get_pyrevit_env_var(handlerFlagName): return
+    HOST_APP.app.DocumentChanged += onDocumentChanged
+    HOST_APP.app.DocumentClosing += onDocumentClosing
+    envvars.set_pyrevit_env_var(handlerFlagName, True)
+
+# Text note index of a document, built at most once per session
+def getTextNoteIndex(doc):
+    cache = getIndexCache()
+    key = documentKey(doc)
+    index = cache.get(key)
+    if index is None:
+        registerHandlers()
+        index = TextNoteIndex(doc)
+        cache[key] = index
+    index.refresh()
+    return index